@@ -0,0 +1,404 @@
+"""Differential fuzzing of the optimized backends against the reference
+`part1`/`part2` of every day.
+
+Random small inputs, biased towards known edge cases (overlapping spelled
+digits, all-joker hands, seeds on range boundaries...), are solved by the
+reference and by every backend registered in `BACKENDS`. A mismatch is
+shrunk to a minimal input on which the reference still succeeds and the
+backend still disagrees. The time of every backend relative to the
+reference on the same cases is reported as its speedup.
+
+    python bench/fuzz.py [--days 4 7] [--cases 300] [--seed 0]
+"""
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import days  # noqa: E402
+import synthetic  # noqa: E402
+
+Solver = Callable[[List[str]], Any]
+
+# Spelled digits sharing letters, the classic trap of day 01 part 2
+OVERLAPS = ["eightwo", "oneight", "twone", "threeight", "fiveight", "sevenine"]
+
+
+def gen_day01(rng: random.Random, size: int) -> List[str]:
+    pieces = synthetic.SPELLED + OVERLAPS + list(string.digits[1:])
+    lines = []
+    for _ in range(size):
+        parts = [
+            rng.choice(pieces)
+            if rng.random() < 0.5
+            else "".join(rng.choices("abcxyzenotw", k=rng.randint(1, 3)))
+            for _ in range(rng.randint(1, 5))
+        ]
+        lines.append("".join(parts))
+    return lines
+
+
+def gen_day03(rng: random.Random, size: int) -> List[str]:
+    """Small grids, often with numbers ending a line or sharing a star"""
+    if rng.random() < 0.3:
+        return synthetic.day03(size, rng, width=rng.randint(1, 12))
+    width = rng.randint(1, 8)
+    return [
+        "".join(rng.choices("....123*#", k=width)) for _ in range(size)
+    ]
+
+
+def gen_day04(rng: random.Random, size: int) -> List[str]:
+    """Fixed width cards, some with repeated numbers"""
+    lines = synthetic.day04(size, rng, winning=rng.randint(1, 5))
+    for i in rng.sample(range(len(lines)), rng.randint(0, len(lines))):
+        head, _, drawn = lines[i].partition(" | ")
+        drawn = drawn.split()
+        drawn[rng.randrange(len(drawn))] = rng.choice(drawn)
+        lines[i] = head + " | " + " ".join(f"{x:>2}" for x in drawn)
+    return lines
+
+
+def gen_day05(rng: random.Random, size: int) -> List[str]:
+    """Tiny number space so that seeds often hit range boundaries"""
+    space = rng.choice([20, 50, 100])
+    seeds = []
+    for _ in range(rng.randint(1, 4)):
+        start = rng.randrange(space)
+        seeds += [start, rng.randint(1, space - start)]
+    lines = ["seeds: " + " ".join(map(str, seeds))]
+    stages = ["seed", "soil", "fertilizer", "water", "light"]
+    stages += ["temperature", "humidity", "location"]
+    for source, dest in zip(stages, stages[1:]):
+        lines += ["", f"{source}-to-{dest} map:"]
+        cuts = sorted(rng.sample(range(1, space), min(size, space - 1)))
+        segments = list(zip([0] + cuts, cuts + [space]))
+        for start, end in rng.sample(segments, rng.randint(1, len(segments))):
+            dest_start = rng.randrange(space)
+            lines.append(f"{dest_start} {start} {end - start}")
+    return lines
+
+
+def gen_day07(rng: random.Random, size: int) -> List[str]:
+    cards = rng.choice(["AKQJT98765432", "JJJJ2A", "J2", "KKJ"])
+    lines = []
+    for _ in range(size):
+        hand = "".join(rng.choices(cards, k=5))
+        if rng.random() < 0.1:
+            hand = "JJJJJ"
+        lines.append(f"{hand} {rng.randint(1, 50)}")
+    return lines
+
+
+GENERATORS: Dict[int, Callable[[random.Random, int], List[str]]] = {
+    1: gen_day01,
+    3: gen_day03,
+    2: lambda rng, size: synthetic.day02(size, rng),
+    4: gen_day04,
+    5: gen_day05,
+    7: gen_day07,
+    8: lambda rng, size: synthetic.day08(
+        size * 4, rng, ghosts=rng.randint(1, 4)
+    ),
+}
+
+
+def _with_file(lines: List[str], solve: Callable[[str], Any]) -> Any:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "input.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return solve(path)
+
+
+def kernel_backends(day: int, part: str) -> List[Tuple[str, Solver]]:
+    """Backends of line-independent parts built on the per-line kernels"""
+    import mapreduce
+    from follow import Follower
+
+    kernel = days.load(day).KERNELS[part]
+
+    def follow(lines):
+        # Append the input in two halves to exercise the resumed state
+        def solve(path):
+            half = len(lines) // 2
+            with open(path, "w") as f:
+                f.write("".join(line + "\n" for line in lines[:half]))
+            Follower(day, path).poll()
+            with open(path, "a") as f:
+                f.write("".join(line + "\n" for line in lines[half:]))
+            follower = Follower(day, path)
+            follower.poll()
+            return follower.totals[part]
+
+        return _with_file([], solve)
+
+    return [
+        ("kernels", lambda lines: sum(map(kernel, lines))),
+        (
+            "mapreduce",
+            lambda lines: _with_file(
+                lines,
+                lambda path: mapreduce.map_reduce(
+                    path, kernel, workers=1, chunk_bytes=64
+                ),
+            ),
+        ),
+        ("follow", follow),
+    ]
+
+
+def _backends() -> Dict[Tuple[int, str], List[Tuple[str, Solver]]]:
+    d02, d03, d04, d05, d07, d08 = (
+        days.load(day) for day in (2, 3, 4, 5, 7, 8)
+    )
+
+    def schematic(index):
+        def solve(lines):
+            schematic = d03.Schematic(lines)
+            return (schematic.part_sum, schematic.gear_sum)[index]
+
+        return solve
+
+    def edited(index):
+        # Reach the input by random cell edits from a scrambled grid, and
+        # check the sums against a fresh Schematic after every edit
+        def solve(lines):
+            rng = random.Random("\n".join(lines))
+            grid = [
+                "".join(rng.choice(".1*#") for _ in line) for line in lines
+            ]
+            schematic = d03.Schematic(grid)
+            cells = [
+                (r, c)
+                for r, line in enumerate(lines)
+                for c in range(len(line))
+            ]
+            # Random detours first, then every cell to its final character
+            detours = [
+                (r, c, rng.choice("9.*+"))
+                for r, c in rng.choices(cells, k=len(cells))
+            ]
+            final = [
+                (r, c, lines[r][c]) for r, c in rng.sample(cells, len(cells))
+            ]
+            for r, c, char in detours + final:
+                schematic.set(r, c, char)
+                grid[r] = grid[r][:c] + char + grid[r][c + 1 :]
+                fresh = d03.Schematic(grid)
+                if (schematic.part_sum, schematic.gear_sum) != (
+                    fresh.part_sum,
+                    fresh.gear_sum,
+                ):
+                    raise AssertionError(f"after set({r}, {c}, {char!r})")
+            return (schematic.part_sum, schematic.gear_sum)[index]
+
+        return solve
+
+    def live(index):
+        def solve(lines):
+            winnings = d07.LiveWinnings()
+            for line in lines:
+                hand, bid = line.split()
+                winnings.add(hand, int(bid))
+            return winnings.totals[index]
+
+        return solve
+
+    def table_part1(lines):
+        network = d08.parse_network(lines)
+        table = d08.DistanceTable.build(
+            network, d08.name_mask(network, "ZZZ", suffix=False)
+        )
+        return table.steps(network.codes.index(int("AAA", 36)))
+
+    backends = {
+        (1, "part1"): kernel_backends(1, "part1"),
+        (1, "part2"): kernel_backends(1, "part2"),
+        (2, "part1"): kernel_backends(2, "part1")
+        + [
+            ("solve", lambda lines: d02.solve(lines)[0]),
+            ("table", lambda lines: d02.GameTable(lines).possible()),
+            (
+                "table_many",
+                lambda lines: d02.GameTable(lines).possible_many(
+                    [(12, 13, 14)]
+                )[0],
+            ),
+        ],
+        (2, "part2"): kernel_backends(2, "part2")
+        + [
+            ("solve", lambda lines: d02.solve(lines)[1]),
+            ("table", lambda lines: d02.GameTable(lines).powers()),
+        ],
+        (3, "part1"): [("schematic", schematic(0)), ("edited", edited(0))],
+        (3, "part2"): [("schematic", schematic(1)), ("edited", edited(1))],
+        (4, "part1"): kernel_backends(4, "part1"),
+        (4, "part2"): [
+            ("stream", lambda lines: d04.part2_stream(iter(lines)))
+        ],
+        (5, "part2"): [
+            ("reverse", d05.part2_reverse),
+            (
+                "sharded",
+                lambda lines: d05.part2_parallel(lines, workers=1, shards=3),
+            ),
+        ],
+        (7, "part1"): [("live", live(0))],
+        (7, "part2"): [("live", live(1))],
+        (8, "part1"): [("table", table_part1)],
+        (8, "part2"): [
+            ("table", d08.part2_table),
+            ("lockstep", d08.part2_lockstep),
+        ],
+    }
+    if days.numpy() is not None:
+        backends[4, "part1"].append(
+            ("matrix", lambda lines: d04.CardMatrix(lines).points())
+        )
+        backends[4, "part2"].append(
+            ("matrix", lambda lines: d04.CardMatrix(lines).cards())
+        )
+    return backends
+
+
+BACKENDS = _backends()
+
+
+def _fails(reference: Solver, backend: Solver, lines: List[str]) -> bool:
+    """Return whether backend disagrees on a valid input"""
+    try:
+        expected = reference(lines)
+    except Exception:
+        return False
+    try:
+        return backend(lines) != expected
+    except Exception:
+        return True
+
+
+def shrink(reference: Solver, backend: Solver, lines: List[str]) -> List[str]:
+    """Return a minimal failing input: drop chunks of lines, then shorten
+    numbers and characters within lines while the failure persists"""
+    chunk = max(len(lines) // 2, 1)
+    while chunk >= 1:
+        i = 0
+        while i < len(lines):
+            candidate = lines[:i] + lines[i + chunk :]
+            if candidate and _fails(reference, backend, candidate):
+                lines = candidate
+            else:
+                i += chunk
+        chunk //= 2
+
+    for i in range(len(lines)):
+        # Shrink integers towards zero
+        for match in reversed(list(re.finditer(r"\d+", lines[i]))):
+            value = int(match.group())
+            for smaller in sorted({0, 1, value // 2}):
+                if smaller >= value:
+                    continue
+                line = (
+                    lines[i][: match.start()]
+                    + str(smaller)
+                    + lines[i][match.end() :]
+                )
+                candidate = lines[:i] + [line] + lines[i + 1 :]
+                if _fails(reference, backend, candidate):
+                    lines = candidate
+                    break
+        # Drop single characters
+        j = 0
+        while j < len(lines[i]):
+            line = lines[i][:j] + lines[i][j + 1 :]
+            candidate = lines[:i] + [line] + lines[i + 1 :]
+            if _fails(reference, backend, candidate):
+                lines = candidate
+            else:
+                j += 1
+    return lines
+
+
+def _timed(solve: Solver, lines: List[str]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = solve(lines)
+    return result, time.perf_counter() - start
+
+
+def fuzz_part(
+    day: int, part: str, cases: int, rng: random.Random, max_size: int
+) -> Tuple[Dict[str, float], List[Tuple[str, List[str], Any, Any]]]:
+    """Return speedup per backend and the shrunk failures"""
+    reference = getattr(days.load(day), part)
+    elapsed: Dict[str, float] = defaultdict(float)
+    failures = []
+    failed = set()
+    for _ in range(cases):
+        lines = GENERATORS[day](rng, rng.randint(1, max_size))
+        try:
+            expected, ref_time = _timed(reference, lines)
+        except Exception:
+            continue  # not a valid input for the reference
+        for name, backend in BACKENDS[day, part]:
+            elapsed[name, "reference"] += ref_time
+            try:
+                result, backend_time = _timed(backend, lines)
+            except Exception as e:
+                result, backend_time = f"{type(e).__name__}: {e}", 0.0
+            elapsed[name, "backend"] += backend_time
+            if result != expected and name not in failed:
+                failed.add(name)
+                minimal = shrink(reference, backend, lines)
+                try:
+                    got = backend(minimal)
+                except Exception as e:
+                    got = f"{type(e).__name__}: {e}"
+                failures.append((name, minimal, reference(minimal), got))
+
+    speedups = {
+        name: elapsed[name, "reference"] / max(elapsed[name, "backend"], 1e-9)
+        for name, _ in BACKENDS[day, part]
+    }
+    return speedups, failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=None)
+    parser.add_argument("--cases", type=int, default=200)
+    parser.add_argument("--max-size", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    mismatches = 0
+    for day, part in sorted(BACKENDS):
+        if args.days and day not in args.days:
+            continue
+        speedups, failures = fuzz_part(
+            day, part, args.cases, rng, args.max_size
+        )
+        summary = ", ".join(
+            f"{name} {speedup:.2f}x" for name, speedup in speedups.items()
+        )
+        status = "FAIL" if failures else "ok"
+        print(f"day {day:02d} {part}: {status:4} {summary}")
+        for name, lines, expected, got in failures:
+            mismatches += 1
+            print(f"  {name}: expected {expected!r}, got {got!r} on")
+            for line in lines:
+                print(f"    {line}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Report `python -X importtime` startup cost of every day module.
+
+    python bench/importtime.py [--repeat 5] [--top 5]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+from days import DAYS  # noqa: E402
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """Return {module: (self us, cumulative us)} for the module and every
+    module it pulls in, measured in a fresh interpreter"""
+    code = (
+        f"import sys; sys.path.insert(0, {str(SRC)!r}); "
+        f"__import__({module!r})"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = len(name) - len(name.lstrip())
+        entries.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+
+    # Children are logged before their parent, so walk back from the module
+    # until the previous top level import, which was part of startup
+    times = {}
+    for i in range(len(entries) - 1, -1, -1):
+        if entries[i][1] == module:
+            break
+    for depth, name, self_us, cumulative_us in reversed(entries[: i + 1]):
+        if name != module and depth == entries[i][0]:
+            break
+        times[name] = (self_us, cumulative_us)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'day':>4} {'median ms':>10} {'min ms':>8}  heaviest imports")
+    for day in DAYS:
+        module = f"{day:02d}"
+        cumulative: List[int] = []
+        for _ in range(args.repeat):
+            times = import_times(module)
+            cumulative.append(times[module][1])
+        heaviest = sorted(
+            (name for name in times if name != module),
+            key=lambda name: times[name][1],
+            reverse=True,
+        )[: args.top]
+        print(
+            f"{module:>4} {statistics.median(cumulative) / 1000:>10.2f} "
+            f"{min(cumulative) / 1000:>8.2f}  "
+            + ", ".join(
+                f"{name} {times[name][1] / 1000:.1f}" for name in heaviest
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Measure peak memory of every part on scaled synthetic inputs.
+
+Each measurement runs in a fresh interpreter so that peak RSS is not
+shared between parts. Peak traced memory (tracemalloc) covers only the part
+call, the RSS delta is the growth of the peak RSS over the process with
+its input already loaded. Days whose traced peak grows worse than linearly
+with the input size are flagged.
+
+    python bench/memory.py [--days 4 5] [--scale 1] [--steps 4]
+"""
+import argparse
+import json
+import math
+import resource
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import days  # noqa: E402
+from synthetic import generate  # noqa: E402
+
+# Smallest input size of each day, doubled at every step
+BASE_SIZES = {
+    1: 20_000,
+    2: 5_000,
+    3: 200,
+    4: 5_000,
+    5: 100,
+    6: 200_000,
+    7: 5_000,
+    8: 2_000,
+}
+# Exponent of the size above which growth counts as worse than linear
+SUPERLINEAR = 1.15
+
+
+def _max_rss() -> int:
+    """Return peak resident set size of this process in bytes"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def measure(day: int, part: str, n: int) -> Dict[str, int]:
+    """Measure a single part in the current process"""
+    lines = generate(day, n)
+    solve = getattr(days.load(day), part)
+    rss_before = _max_rss()
+    tracemalloc.start()
+    solve(lines)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "lines": len(lines),
+        "peak_traced": peak,
+        "rss_delta": _max_rss() - rss_before,
+    }
+
+
+def measure_isolated(day: int, part: str, n: int) -> Dict[str, int]:
+    """Measure a single part in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, __file__, "--measure", str(day), part, str(n)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def growth_exponent(sizes: List[int], values: List[int]) -> float:
+    """Return least squares slope of log(value) over log(size)"""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(value, 1)) for value in values]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    var = sum((x - mean_x) ** 2 for x in xs)
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    return cov / var if var else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=list(days.DAYS))
+    parser.add_argument("--parts", nargs="+", default=["part1", "part2"])
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--steps", type=int, default=4)
+    parser.add_argument("--measure", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        day, part, n = args.measure
+        print(json.dumps(measure(int(day), part, int(n))))
+        return
+
+    print(
+        f"{'day':>4} {'part':>6} {'n':>9} {'lines':>9} {'peak KiB':>10} "
+        f"{'B/line':>9} {'RSS KiB':>9}"
+    )
+    flagged = []
+    for day in args.days:
+        for part in args.parts:
+            sizes = [
+                int(BASE_SIZES[day] * args.scale) * 2**step
+                for step in range(args.steps)
+            ]
+            peaks = []
+            for n in sizes:
+                result = measure_isolated(day, part, n)
+                peaks.append(result["peak_traced"])
+                print(
+                    f"{day:>4} {part:>6} {n:>9} {result['lines']:>9} "
+                    f"{result['peak_traced'] / 1024:>10.1f} "
+                    f"{result['peak_traced'] / result['lines']:>9.1f} "
+                    f"{result['rss_delta'] / 1024:>9.0f}"
+                )
+            exponent = growth_exponent(sizes, peaks)
+            note = "  <- worse than linear" if exponent > SUPERLINEAR else ""
+            print(f"{'':>11} growth exponent {exponent:.2f}{note}")
+            if note:
+                flagged.append(f"day {day:02d} {part} ({exponent:.2f})")
+
+    if flagged:
+        print("memory grows worse than linearly: " + ", ".join(flagged))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Time every part with warmup and repeats, and compare saved baselines.
+
+Each day/part/size is run `--warmup` times untimed, then `--repeats` times.
+Samples outside Tukey's fences (1.5 IQR beyond the quartiles) are rejected
+as outliers, median and IQR of the rest are reported and saved with the
+samples as a JSON baseline. `compare` matches two baselines and tests each
+difference with a two-sided Mann-Whitney U test, so only significant
+speedups and regressions are flagged.
+
+    python bench/runner.py run --days 4 5 --scales 0.1 1 -o before.json
+    python bench/runner.py run --days 4 5 --scales 0.1 1 -o after.json
+    python bench/runner.py compare before.json after.json
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import days  # noqa: E402
+from memory import BASE_SIZES  # noqa: E402
+from synthetic import generate  # noqa: E402
+
+
+def quartiles(samples: Sequence[float]) -> Tuple[float, float, float]:
+    if len(samples) < 2:
+        return samples[0], samples[0], samples[0]
+    return tuple(statistics.quantiles(samples, n=4, method="inclusive"))
+
+
+def reject_outliers(samples: Sequence[float]) -> List[float]:
+    """Return samples within Tukey's fences"""
+    q1, _, q3 = quartiles(samples)
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    return [s for s in samples if low <= s <= high]
+
+
+def mann_whitney(a: Sequence[float], b: Sequence[float]) -> float:
+    """Return two-sided p-value of the Mann-Whitney U test of a and b,
+    with the normal approximation corrected for ties and continuity"""
+    n1, n2 = len(a), len(b)
+    values = sorted([(x, 0) for x in a] + [(x, 1) for x in b])
+    rank_sum, ties, i = 0.0, 0, 0
+    while i < len(values):
+        j = i
+        while j < len(values) and values[j][0] == values[i][0]:
+            j += 1
+        # Tied values share the average of their ranks
+        rank = (i + j + 1) / 2
+        rank_sum += rank * sum(1 for _, group in values[i:j] if group == 0)
+        ties += (j - i) ** 3 - (j - i)
+        i = j
+
+    n = n1 + n2
+    u = rank_sum - n1 * (n1 + 1) / 2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))))
+    if sigma == 0:
+        return 1.0
+    z = max(abs(u - n1 * n2 / 2) - 0.5, 0) / sigma
+    return math.erfc(z / math.sqrt(2))
+
+
+def time_part(
+    day: int, part: str, n: int, warmup: int, repeats: int
+) -> Dict[str, Any]:
+    lines = generate(day, n)
+    solve = getattr(days.load(day), part)
+    for _ in range(warmup):
+        solve(lines)
+
+    samples = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        solve(lines)
+        samples.append(time.perf_counter() - start)
+
+    kept = reject_outliers(samples)
+    q1, median, q3 = quartiles(kept)
+    return {
+        "day": day,
+        "part": part,
+        "n": n,
+        "lines": len(lines),
+        "median": median,
+        "iqr": q3 - q1,
+        "outliers": len(samples) - len(kept),
+        "samples": kept,
+    }
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(args) -> None:
+    results = []
+    print(
+        f"{'day':>4} {'part':>6} {'n':>9} {'median ms':>10} {'IQR ms':>9} "
+        f"{'outliers':>8}"
+    )
+    for day in args.days:
+        for part in args.parts:
+            for scale in args.scales:
+                n = max(int(BASE_SIZES[day] * scale), 1)
+                result = time_part(day, part, n, args.warmup, args.repeats)
+                results.append(result)
+                print(
+                    f"{day:>4} {part:>6} {n:>9} "
+                    f"{result['median'] * 1e3:>10.3f} "
+                    f"{result['iqr'] * 1e3:>9.3f} {result['outliers']:>8}"
+                )
+
+    baseline = {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "warmup": args.warmup,
+            "repeats": args.repeats,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(baseline, f, indent=1)
+    print(f"saved {args.output}")
+
+
+def compare(args) -> int:
+    with open(args.baseline) as f:
+        before = {
+            (r["day"], r["part"], r["n"]): r for r in json.load(f)["results"]
+        }
+    with open(args.candidate) as f:
+        after = json.load(f)["results"]
+
+    regressions = 0
+    print(
+        f"{'day':>4} {'part':>6} {'n':>9} {'before ms':>10} {'after ms':>9} "
+        f"{'speedup':>8} {'p':>7}"
+    )
+    for result in after:
+        key = (result["day"], result["part"], result["n"])
+        if key not in before:
+            continue
+        old = before[key]
+        p = mann_whitney(old["samples"], result["samples"])
+        speedup = old["median"] / result["median"]
+        verdict = ""
+        if p < args.alpha:
+            verdict = "faster" if speedup > 1 else "SLOWER"
+            regressions += speedup < 1
+        print(
+            f"{key[0]:>4} {key[1]:>6} {key[2]:>9} "
+            f"{old['median'] * 1e3:>10.3f} {result['median'] * 1e3:>9.3f} "
+            f"{speedup:>7.2f}x {p:>7.4f} {verdict}"
+        )
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="time parts, save baseline")
+    run_parser.add_argument(
+        "--days", type=int, nargs="+", default=list(days.DAYS)
+    )
+    run_parser.add_argument("--parts", nargs="+", default=["part1", "part2"])
+    run_parser.add_argument("--scales", type=float, nargs="+", default=[1.0])
+    run_parser.add_argument("--warmup", type=int, default=2)
+    run_parser.add_argument("--repeats", type=int, default=15)
+    run_parser.add_argument("-o", "--output", default="baseline.json")
+
+    compare_parser = commands.add_parser(
+        "compare", help="test differences between two baselines"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--alpha", type=float, default=0.01)
+    compare_parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="exit with 1 if anything got significantly slower",
+    )
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+        return 0
+    return compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Measure how parallel engines scale with the number of worker processes.
+
+    python bench/scaling.py mapreduce --day 1 --part part1 --lines 2000000
+    python bench/scaling.py day05 --seeds 1000000 --ranges 30
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import days  # noqa: E402
+import mapreduce  # noqa: E402
+import synthetic  # noqa: E402
+from synthetic import generate  # noqa: E402
+
+
+def worker_counts(max_workers: int):
+    count = 1
+    while count < max_workers:
+        yield count
+        count *= 2
+    yield max_workers
+
+
+def bench_mapreduce(args):
+    kernel = days.load(args.day).KERNELS[args.part]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "input.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(generate(args.day, args.lines)) + "\n")
+        size = os.path.getsize(path)
+
+        baseline = None
+        print(f"day {args.day} {args.part}, {size / 2**20:.1f} MiB")
+        print(f"{'workers':>8} {'seconds':>10} {'MiB/s':>10} {'speedup':>8}")
+        for workers in worker_counts(args.max_workers):
+            start = time.perf_counter()
+            mapreduce.map_reduce(path, kernel, workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(
+                f"{workers:>8} {elapsed:>10.3f} "
+                f"{size / 2**20 / elapsed:>10.1f} {baseline / elapsed:>8.2f}"
+            )
+
+
+def bench_day05(args):
+    day05 = days.load(5)
+    rng = random.Random(0)
+    tables = day05.parse_input(synthetic.day05(args.ranges, rng, seeds=0))[1:]
+    # Disjoint short seed ranges, so that merging keeps them all
+    stride = 2**32 // args.seeds
+    seed_ranges = []
+    for i in range(args.seeds):
+        start = i * stride + rng.randrange(stride // 2)
+        seed_ranges.append((start, start + rng.randint(1, stride // 2)))
+
+    baseline = None
+    print(f"day 5 part2, {args.seeds} seed ranges, {args.ranges} per map")
+    print(f"{'workers':>8} {'seconds':>10} {'ranges/s':>12} {'speedup':>8}")
+    for workers in worker_counts(args.max_workers):
+        start = time.perf_counter()
+        day05.min_location(seed_ranges, tables, workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(
+            f"{workers:>8} {elapsed:>10.3f} "
+            f"{args.seeds / elapsed:>12.0f} {baseline / elapsed:>8.2f}"
+        )
+
+
+ENGINES = {"mapreduce": bench_mapreduce, "day05": bench_day05}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("engine", choices=list(ENGINES))
+    parser.add_argument("--day", type=int, default=1)
+    parser.add_argument("--part", default="part1")
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--seeds", type=int, default=1_000_000)
+    parser.add_argument("--ranges", type=int, default=30)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    ENGINES[args.engine](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Generators of valid synthetic puzzle inputs of arbitrary size.
+
+The scale n is the number of input lines for every day but day 06, whose
+single race lasts n milliseconds, and day 08, whose network has about n
+nodes (at most 36**3 three-character names).
+
+    python bench/synthetic.py 4 100000 > cards.txt
+"""
+import random
+import string
+import sys
+from typing import Callable, Dict, List
+
+SPELLED = [
+    "one",
+    "two",
+    "three",
+    "four",
+    "five",
+    "six",
+    "seven",
+    "eight",
+    "nine",
+]
+
+
+def day01(n: int, rng: random.Random) -> List[str]:
+    lines = []
+    for _ in range(n):
+        parts = [rng.choice(string.digits[1:])]
+        for _ in range(rng.randint(1, 6)):
+            choice = rng.random()
+            if choice < 0.3:
+                parts.append(rng.choice(SPELLED))
+            elif choice < 0.5:
+                parts.append(rng.choice(string.digits[1:]))
+            else:
+                size = rng.randint(1, 4)
+                letters = rng.choices(string.ascii_lowercase, k=size)
+                parts.append("".join(letters))
+        rng.shuffle(parts)
+        lines.append("".join(parts))
+    return lines
+
+
+def day02(n: int, rng: random.Random) -> List[str]:
+    lines = []
+    for game_id in range(1, n + 1):
+        draws = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(["red", "green", "blue"], rng.randint(1, 3))
+            draws.append(
+                ", ".join(f"{rng.randint(1, 20)} {color}" for color in colors)
+            )
+        lines.append(f"Game {game_id}: " + "; ".join(draws))
+    return lines
+
+
+def day03(n: int, rng: random.Random, width: int = 140) -> List[str]:
+    symbols = "*#+$/@%&=-"
+    lines = []
+    for _ in range(n):
+        row = []
+        while len(row) < width:
+            choice = rng.random()
+            if choice < 0.15:
+                row.extend(str(rng.randint(1, 999)))
+                row.append(".")
+            elif choice < 0.22:
+                row.append(rng.choice(symbols))
+            else:
+                row.append(".")
+        lines.append("".join(row[:width]))
+    return lines
+
+
+def day04(
+    n: int, rng: random.Random, winning: int = 10, drawn: int = 25
+) -> List[str]:
+    width = len(str(n))
+    lines = []
+    for i in range(n):
+        # Keep mean matches below one so copy counts stay bounded as in the
+        # real puzzle, and never copy a card past the end of the table
+        choice = rng.random()
+        matches = 0 if choice < 0.65 else rng.randint(1, 2)
+        if choice > 0.95:
+            matches = rng.randint(1, winning)
+        matches = min(matches, n - 1 - i)
+        numbers = rng.sample(range(1, 100), winning + drawn - matches)
+        win_nums = numbers[:winning]
+        draw_nums = win_nums[:matches] + numbers[winning:]
+        rng.shuffle(draw_nums)
+        lines.append(
+            f"Card {i + 1:>{width}}: "
+            + " ".join(f"{x:>2}" for x in win_nums)
+            + " | "
+            + " ".join(f"{x:>2}" for x in draw_nums)
+        )
+    return lines
+
+
+def day05(n: int, rng: random.Random, seeds: int = 10) -> List[str]:
+    """n ranges per map, each map a permutation of contiguous segments"""
+    space = 2**32
+    seed_pairs = []
+    for _ in range(seeds):
+        start = rng.randrange(space - 2**24)
+        seed_pairs.append(f"{start} {rng.randint(1, 2**24)}")
+    lines = ["seeds: " + " ".join(seed_pairs)]
+
+    stages = ["seed", "soil", "fertilizer", "water", "light"]
+    stages += ["temperature", "humidity", "location"]
+    for source, dest in zip(stages, stages[1:]):
+        cuts = sorted(rng.sample(range(1, space), n))
+        segments = list(zip(cuts, cuts[1:] + [space]))
+        targets = segments[:]
+        rng.shuffle(targets)
+        lines += ["", f"{source}-to-{dest} map:"]
+        dest_start = cuts[0]
+        for (start, end), _ in zip(targets, segments):
+            lines.append(f"{dest_start} {start} {end - start}")
+            dest_start += end - start
+    return lines
+
+
+def day06(n: int, rng: random.Random) -> List[str]:
+    """Single race lasting n milliseconds"""
+    hold = rng.randint(1, max(n // 3, 1))
+    return [f"Time:      {n}", f"Distance:  {hold * (n - hold)}"]
+
+
+def day07(n: int, rng: random.Random) -> List[str]:
+    cards = "AKQJT98765432"
+    hands = {}  # insertion ordered, unlike a set, for reproducible inputs
+    while len(hands) < min(n, 13**5):
+        hands["".join(rng.choices(cards, k=5))] = None
+    return [f"{hand} {rng.randint(1, 1000)}" for hand in hands]
+
+
+def day08(n: int, rng: random.Random, ghosts: int = 6) -> List[str]:
+    """Ghost chains from ..A to ..Z nodes, right turns sometimes take a
+    one node detour so the step counts depend on the instructions"""
+    alphabet = string.digits + string.ascii_uppercase
+    n = max(min(n, 36**3 // 2), 4 * ghosts)
+    names = {}  # insertion ordered, unlike a set, for reproducible inputs
+    while len(names) < n:
+        name = "".join(rng.choices(alphabet, k=3))
+        if name[-1] not in "AZ":
+            names[name] = None
+    names = list(names)
+
+    used = {"AAA", "ZZZ"}  # ..A and ..Z names taken so far
+
+    def endpoint(prefix: str, suffix: str) -> str:
+        # Ghosts may share a prefix, redraw it so every node is defined once
+        while prefix + "A" in used or prefix + "Z" in used:
+            prefix = "".join(rng.choices(alphabet, k=2))
+        used.add(prefix + suffix)
+        return prefix + suffix
+
+    lines = ["".join(rng.choices("LR", k=rng.randint(50, 300))), ""]
+    per_ghost = len(names) // ghosts
+    for g in range(ghosts):
+        chain = names[g * per_ghost : (g + 1) * per_ghost]
+        detours, chain = chain[: len(chain) // 3], chain[len(chain) // 3 :]
+        start, end = ("AAA", "ZZZ") if g == 0 else (
+            endpoint(chain[0][:2], "A"),
+            endpoint(chain[-1][:2], "Z"),
+        )
+        chain = [start] + chain[1:-1] + [end]
+        nodes = []
+        for i, node in enumerate(chain[:-1]):
+            right = chain[i + 1]
+            if detours and rng.random() < 0.3:
+                detour = detours.pop()
+                nodes.append(f"{detour} = ({chain[i + 1]}, {chain[i + 1]})")
+                right = detour
+            nodes.append(f"{node} = ({chain[i + 1]}, {right})")
+        nodes.append(f"{end} = ({chain[1]}, {chain[1]})")
+        for detour in detours:
+            nodes.append(f"{detour} = ({detour}, {detour})")
+        lines += nodes
+    return lines
+
+
+GENERATORS: Dict[int, Callable[[int, random.Random], List[str]]] = {
+    1: day01,
+    2: day02,
+    3: day03,
+    4: day04,
+    5: day05,
+    6: day06,
+    7: day07,
+    8: day08,
+}
+
+
+def generate(day: int, n: int, seed: int = 0) -> List[str]:
+    """Return a synthetic input of the day scaled by n"""
+    return GENERATORS[day](n, random.Random(seed))
+
+
+if __name__ == "__main__":
+    day, n = map(int, sys.argv[1:3])
+    print("\n".join(generate(day, n)))
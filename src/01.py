@@ -1,8 +1,52 @@
 from typing import List
 
-from aocd import get_data
+from profiling import phase, profiled
 
 
+# Seach and replace the words with the numbers
+# Instead of replacing directly to digit, a fuzzy replacement is used
+# to avoid replacing the digits that are part of other digits
+STR2NUM = {
+    "one": "o1ne",
+    "two": "t2wo",
+    "three": "th3ree",
+    "four": "f4our",
+    "five": "f5ive",
+    "six": "s6ix",
+    "seven": "se7ven",
+    "eight": "eig8ht",
+    "nine": "ni9ne",
+    "zero": "ze0ro",
+}
+
+
+def calibration_value(line: str) -> int:
+    """Return number formed by the first and last digit of the line"""
+    # Two-Pointer to find the digits
+    l, r = 0, len(line) - 1
+    while l <= r:
+        if not line[l].isdigit():
+            l += 1
+        elif not line[r].isdigit():
+            r -= 1
+        else:
+            return int(line[l] + line[r])
+    return 0
+
+
+def replace_spelled_digits(line: str) -> str:
+    """Insert the digit into every spelled out digit of the line"""
+    for word, num in STR2NUM.items():
+        line = line.replace(word, num)
+    return line
+
+
+def spelled_calibration_value(line: str) -> int:
+    """Return calibration value of a line with spelled out digits"""
+    return calibration_value(replace_spelled_digits(line))
+
+
+@profiled
 def part1(lines: List[str]) -> int:
     """
     The newly-improved calibration document consists of lines of text;
@@ -24,21 +68,11 @@ def part1(lines: List[str]) -> int:
     Consider your entire calibration document.
     What is the sum of all of the calibration values?
     """
-    total = 0
-    for line in lines:
-        # Two-Pointer to find the digits
-        l, r = 0, len(line) - 1
-        while l <= r:
-            if not line[l].isdigit():
-                l += 1
-            elif not line[r].isdigit():
-                r -= 1
-            else:
-                total += int(line[l] + line[r])
-                break
-    return total
+    with phase("solve"):
+        return sum(map(calibration_value, lines))
 
 
+@profiled
 def part2(lines: List[str]) -> int:
     """
     Your calculation isn't quite right. It looks like some of the digits are
@@ -61,30 +95,19 @@ def part2(lines: List[str]) -> int:
 
     What is the sum of all of the calibration values?
     """
-    # Seach and replace the words with the numbers
-    # Instead of replacing directly to digit, a fuzzy replacement is used
-    # to avoid replacing the digits that are part of other digits
-    str2num = {
-        "one": "o1ne",
-        "two": "t2wo",
-        "three": "th3ree",
-        "four": "f4our",
-        "five": "f5ive",
-        "six": "s6ix",
-        "seven": "se7ven",
-        "eight": "eig8ht",
-        "nine": "ni9ne",
-        "zero": "ze0ro",
-    }
-    results = []
-    for line in lines:
-        for word, num in str2num.items():
-            line = line.replace(word, num)
-        results.append(line)
-    return part1(results)
+    with phase("parse"):
+        lines = [replace_spelled_digits(line) for line in lines]
+    with phase("solve"):
+        return part1(lines)
+
+
+# Per-line kernels for line-independent parts, see mapreduce.py
+KERNELS = {"part1": calibration_value, "part2": spelled_calibration_value}
 
 
 if __name__ == "__main__":
+    from inputs import get_data
+
     data = get_data(year=2023, day=1).splitlines()
     print(part1(data))
     print(part2(data))
@@ -1,9 +1,14 @@
-from typing import List
+from typing import Dict, Iterator, List, Set, Tuple
 from collections import defaultdict
 
-from aocd import get_data
+from profiling import profiled
 
 
+def _is_symbol(char: str) -> bool:
+    return char != "." and not char.isdigit()
+
+
+@profiled
 def part1(lines: List[str]):
     """
     The engineer explains that an engine part seems to be missing from the
@@ -38,9 +43,6 @@ def part1(lines: List[str]):
     What is the sum of all of the part numbers in the engine schematic?
     """
     # Find number then check for any symbol its perimeter
-    symbols = set(
-        ["+", "-", "*", "/", "$", "#", "@", "&", "%", "^", "!", "~", "="]
-    )
     result = []
     for i, line in enumerate(lines):
         num = ""
@@ -50,35 +52,22 @@ def part1(lines: List[str]):
                 if j != len(line) - 1:
                     # Check if next char is digit if not last char in the line
                     continue
+                j += 1  # the number ends the line, j is the column after it
             if num:
                 # Search for symbol accross the perimeter
                 left_idx = max(j - len(num) - 1, 0)
-                right_idx = min(j + 1, len(line))
-                # Check top
-                if (
-                    i > 0
-                    and len(set(lines[i - 1][left_idx:right_idx]) & symbols)
-                    > 0
-                ):
-                    result.append(int(num))
-                # Check bottom
-                elif (
-                    i < len(lines) - 1
-                    and len(set(lines[i + 1][left_idx:right_idx]) & symbols)
-                    > 0
-                ):
-                    result.append(int(num))
-                # Check left and right
-                elif (
-                    lines[i][left_idx] in symbols
-                    or lines[i][right_idx - 1] in symbols
+                right_idx = j + 1
+                if any(
+                    _is_symbol(c)
+                    for row in lines[max(i - 1, 0) : i + 2]
+                    for c in row[left_idx:right_idx]
                 ):
                     result.append(int(num))
             num = ""
-        # Check top and bottom
     return sum(result)
 
 
+@profiled
 def part2(lines):
     """
     The missing part wasn't the only issue - one of the gears in the engine is
@@ -122,30 +111,17 @@ def part2(lines):
                 if j != len(line) - 1:
                     # Check if next char is digit if not last char in the line
                     continue
+                j += 1  # the number ends the line, j is the column after it
             if num:
                 # Search for symbol accross the perimeter
                 left_idx = max(j - len(num) - 1, 0)
-                right_idx = min(j + 1, len(line))
-                # Check top
-                if i > 0 and symbol in lines[i - 1][left_idx:right_idx]:
-                    asterisk_coords[
-                        (i - 1, lines[i - 1].index("*", left_idx))
-                    ].append(int(num))
-                # Check bottom
-                elif (
-                    i < len(lines) - 1
-                    and symbol in lines[i + 1][left_idx:right_idx]
-                ):
-                    asterisk_coords[
-                        (i + 1, lines[i + 1].index("*", left_idx))
-                    ].append(int(num))
-                # Check left and right
-                elif lines[i][left_idx] == symbol:
-                    asterisk_coords[(i, left_idx)].append(int(num))
-                elif lines[i][right_idx - 1] == symbol:
-                    asterisk_coords[(i, right_idx - 1)].append(int(num))
+                right_idx = j + 1
+                # The number counts towards every asterisk around it
+                for r in range(max(i - 1, 0), min(i + 2, len(lines))):
+                    for c in range(left_idx, min(right_idx, len(lines[r]))):
+                        if lines[r][c] == symbol:
+                            asterisk_coords[(r, c)].append(int(num))
             num = ""
-        # Check top and bottom
 
     # For each gear, check if it has two adjacent numbers and calculate ratio
     for nums in asterisk_coords.values():
@@ -154,7 +130,153 @@ def part2(lines):
     return sum(result)
 
 
+class Schematic:
+    """Engine schematic keeping the part number and gear ratio sums up to
+    date under single cell edits.
+
+    Numbers are indexed as spans of digits with the count of symbols around
+    each of them, and every `*` with the set of spans around it. An edit
+    only re-indexes the spans and the star of its 3x3 neighbourhood, so it
+    costs O(1) for numbers of bounded length.
+
+    The sums are those of `part1` and `part2` on the current grid.
+    """
+
+    def __init__(self, lines: List[str]):
+        self.grid = [list(line) for line in lines]
+        # span id: (row, start, end, value) of the digits in [start, end)
+        self.spans: Dict[int, Tuple[int, int, int, int]] = {}
+        self.cells: Dict[Tuple[int, int], int] = {}  # digit cell: span id
+        self.symbols: Dict[int, int] = {}  # span id: adjacent symbols
+        self.stars: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+        self.part_sum = 0
+        self.gear_sum = 0
+        self._next_id = 0
+        for row, line in enumerate(self.grid):
+            col = 0
+            while col < len(line):
+                if line[col].isdigit():
+                    col = self._add_span(row, col)
+                else:
+                    col += 1
+
+    def __getitem__(self, cell: Tuple[int, int]) -> str:
+        row, col = cell
+        return self.grid[row][col]
+
+    def _around(
+        self, row: int, start: int, end: int
+    ) -> Iterator[Tuple[int, int]]:
+        """Yield the in-bounds cells around [start, end) of a row"""
+        for r in range(max(row - 1, 0), min(row + 2, len(self.grid))):
+            for c in range(max(start - 1, 0), min(end + 1, len(self.grid[r]))):
+                if r != row or not start <= c < end:
+                    yield r, c
+
+    def _gear(self, star: Tuple[int, int]) -> int:
+        spans = self.stars.get(star, ())
+        if len(spans) != 2:
+            return 0
+        first, second = (self.spans[span][3] for span in spans)
+        return first * second
+
+    def _link(self, star: Tuple[int, int], span: int, add: bool) -> None:
+        self.gear_sum -= self._gear(star)
+        if add:
+            self.stars[star].add(span)
+        else:
+            self.stars[star].discard(span)
+        self.gear_sum += self._gear(star)
+
+    def _add_span(self, row: int, col: int) -> int:
+        """Index the number starting at col, return the column after it"""
+        line = self.grid[row]
+        end = col
+        while end < len(line) and line[end].isdigit():
+            end += 1
+        span = self._next_id
+        self._next_id += 1
+        self.spans[span] = (row, col, end, int("".join(line[col:end])))
+        for c in range(col, end):
+            self.cells[row, c] = span
+
+        count = 0
+        for r, c in self._around(row, col, end):
+            char = self.grid[r][c]
+            if _is_symbol(char):
+                count += 1
+                if char == "*":
+                    self._link((r, c), span, add=True)
+        self.symbols[span] = count
+        if count:
+            self.part_sum += self.spans[span][3]
+        return end
+
+    def _remove_span(self, span: int) -> None:
+        row, start, end, value = self.spans[span]
+        for r, c in self._around(row, start, end):
+            if self.grid[r][c] == "*":
+                self._link((r, c), span, add=False)
+        if self.symbols.pop(span):
+            self.part_sum -= value
+        for c in range(start, end):
+            del self.cells[row, c]
+        del self.spans[span]
+
+    def set(self, row: int, col: int, char: str) -> None:
+        """Replace a cell and update the sums"""
+        old = self.grid[row][col]
+        if char == old:
+            return
+        line = self.grid[row]
+
+        # Numbers of the row through or next to the cell may split or merge
+        touched = {
+            self.cells[row, c]
+            for c in (col - 1, col, col + 1)
+            if (row, c) in self.cells
+        }
+        for span in touched:
+            self._remove_span(span)
+
+        # Numbers left around the cell are on the rows above and below
+        around = {
+            self.cells[cell]
+            for cell in self._around(row, col, col + 1)
+            if cell in self.cells
+        }
+        if _is_symbol(old):
+            for span in around:
+                self.symbols[span] -= 1
+                if not self.symbols[span]:
+                    self.part_sum -= self.spans[span][3]
+            if old == "*":
+                self.gear_sum -= self._gear((row, col))
+                self.stars.pop((row, col), None)
+
+        line[col] = char
+        if _is_symbol(char):
+            for span in around:
+                if not self.symbols[span]:
+                    self.part_sum += self.spans[span][3]
+                self.symbols[span] += 1
+                if char == "*":
+                    self._link((row, col), span, add=True)
+
+        # Re-index the numbers of the row around the cell
+        c = max(col - 1, 0)
+        while c > 0 and line[c].isdigit() and line[c - 1].isdigit():
+            c -= 1
+        while c <= min(col + 1, len(line) - 1):
+            if line[c].isdigit():
+                c = self._add_span(row, c)
+            else:
+                c += 1
+
+
 if __name__ == "__main__":
+    from inputs import get_data
+
     data = get_data(year=2023, day=3).splitlines()
     print(part1(data))
     print(part2(data))
@@ -1,7 +1,43 @@
-from typing import List
-from aocd import get_data
+from array import array
+from typing import Iterable, List, Sequence
 
+from days import numpy as _numpy
+from profiling import phase, profiled
 
+
+def count_matches(line: str) -> int:
+    """Return number of drawn numbers that are also winning numbers"""
+    _, numbers = line.split(": ")
+    win_nums, draw_nums = map(
+        lambda x: set(map(int, x.split())), numbers.split(" | ")
+    )
+    return len(win_nums & draw_nums)
+
+
+def card_score(line: str) -> int:
+    """Return points the card is worth"""
+    matches = count_matches(line)
+    return 2 ** (matches - 1) if matches else 0
+
+
+def total_cards(matches: Sequence[int]) -> int:
+    """Return total scratchcards won by cards with the given match counts"""
+    # Running difference array: each card adds its copies to the window of
+    # following cards in O(1) instead of looping over the window
+    diff = array("q", bytes(8 * (len(matches) + 1)))
+    copies = 0
+    total = 0
+    for i, m in enumerate(matches):
+        copies += diff[i]
+        count = copies + 1
+        total += count
+        if m:
+            diff[i + 1] += count
+            diff[i + m + 1] -= count
+    return total
+
+
+@profiled
 def part1(lines: List[str]):
     """
     The Elf leads you over to the pile of colorful cards. There, you discover
@@ -42,19 +78,13 @@ def part1(lines: List[str]):
     Take a seat in the large pile of colorful cards.
     How many points are they worth in total?
     """
-    total = 0
-    for line in lines:
-        _, numbers = line.split(": ")
-        win_nums, draw_nums = map(
-            lambda x: set(map(int, x.split())), numbers.split(" | ")
-        )
-        intersect = win_nums & draw_nums
-        score = 2 ** (len(intersect) - 1) if intersect else 0
-        # print(score)
-        total += score
-    return total
+    with phase("parse"):
+        matches = array("q", map(count_matches, lines))
+    with phase("solve"):
+        return sum(2 ** (m - 1) for m in matches if m)
 
 
+@profiled
 def part2(lines: List[str]):
     """
     Just as you're about to report your findings to the Elf, one of you
@@ -108,19 +138,161 @@ def part2(lines: List[str]):
     scratchcards are won. Including the original set of scratchcards, how many
     total scratchcards do you end up with?
     """
-    cards = [1] * len(lines)
-    for i, line in enumerate(lines):
-        _, numbers = line.split(": ")
-        win_nums, draw_nums = map(
-            lambda x: set(map(int, x.split())), numbers.split(" | ")
-        )
-        intersect = win_nums & draw_nums
-        for j in range(i + 1, i + len(intersect) + 1):
-            cards[j] += cards[i]
-    return sum(cards)
+    with phase("parse"):
+        matches = array("q", map(count_matches, lines))
+    with phase("solve"):
+        return total_cards(matches)
+
+
+def part2_stream(lines: Iterable[str]) -> int:
+    """Streaming variant of `part2` for arbitrarily long card iterators.
+
+    A card only wins copies of the next `matches` cards, so pending copy
+    counts are kept in a ring buffer of differences sized by the largest
+    match count seen so far, making memory O(max matches) instead of
+    O(cards).
+    """
+    ring = array("q", [0])
+    pos = 0
+    copies = 0
+    total = 0
+    for line in lines:
+        matches = count_matches(line)
+        if matches >= len(ring):
+            # Unroll the ring from the current position into a bigger buffer
+            size = len(ring)
+            ring = array("q", [ring[(pos + j) % size] for j in range(size)])
+            ring.extend([0] * (matches + 1 - size))
+            pos = 0
+        copies += ring[pos]
+        ring[pos] = 0
+        count = copies + 1
+        total += count
+        if matches:
+            size = len(ring)
+            ring[(pos + 1) % size] += count
+            ring[(pos + matches + 1) % size] -= count
+        pos = (pos + 1) % len(ring)
+    return total
+
+
+class CardMatrix:
+    """Cards parsed in bulk into `cards x winning` and `cards x drawn` int8
+    NumPy matrices, read at fixed offsets of a single bytes block.
+
+    Match counts of all cards come from a vectorized membership test on
+    per-card presence tables of the numbers. Without NumPy, or when the
+    lines are not all laid out with the same fixed width fields of at most
+    two digits, match counts are computed line by line instead and the
+    matrices are None.
+    """
+
+    CHUNK = 1 << 16  # cards per presence table, bounds temporary memory
+
+    def __init__(self, lines: List[str]):
+        self.winning = self.drawn = None
+        if _numpy() is not None and lines:
+            parsed = self._parse_fixed(lines)
+            if parsed is not None:
+                self.winning, self.drawn = parsed
+        if self.winning is None:
+            self.matches = array("q", map(count_matches, lines))
+        else:
+            self.matches = self._count_matches()
+
+    @staticmethod
+    def _parse_fixed(lines: List[str]):
+        np = _numpy()
+        first = lines[0]
+        colon, bar = first.find(":"), first.find(" | ") + 1
+        stride = len(first) + 1
+        if (
+            colon < 0
+            or bar <= colon
+            or (bar - colon - 2) % 3
+            or (stride - bar - 2) % 3
+        ):
+            return None
+        block = ("\n".join(lines) + "\n").encode()
+        if len(block) != stride * len(lines):
+            return None
+        rows = np.frombuffer(block, dtype=np.uint8).reshape(-1, stride)
+        if (rows[:, colon] != ord(":")).any() or (
+            rows[:, bar] != ord("|")
+        ).any():
+            return None
+
+        def fields(start: int, count: int):
+            # " dd" fields from start, tens digit may be a space
+            offsets = start + 3 * np.arange(count)
+            spaces, tens, ones = (rows[:, offsets + i] for i in range(3))
+            if (
+                (spaces != ord(" ")).any()
+                or ((ones < ord("0")) | (ones > ord("9"))).any()
+                or (
+                    (tens != ord(" "))
+                    & ((tens < ord("0")) | (tens > ord("9")))
+                ).any()
+            ):
+                return None
+            tens = np.where(tens == ord(" "), 0, tens - ord("0"))
+            return (tens * 10 + (ones - ord("0"))).astype(np.int8)
+
+        winning = fields(colon + 1, (bar - colon - 2) // 3)
+        drawn = fields(bar + 1, (stride - bar - 2) // 3)
+        if winning is None or drawn is None:
+            return None
+        return winning, drawn
+
+    def _count_matches(self):
+        """Return per card number of distinct drawn numbers that are also
+        winning numbers"""
+        np = _numpy()
+        matches = np.empty(len(self.winning), dtype=np.int64)
+        for start in range(0, len(matches), self.CHUNK):
+            winning = self.winning[start : start + self.CHUNK]
+            drawn = self.drawn[start : start + self.CHUNK]
+            cards = np.arange(len(winning))[:, None]
+            is_winning = np.zeros((len(winning), 100), dtype=bool)
+            is_winning[cards, winning] = True
+            is_drawn = np.zeros_like(is_winning)
+            is_drawn[cards, drawn] = True
+            matches[start : start + self.CHUNK] = (
+                is_winning & is_drawn
+            ).sum(axis=1)
+        return matches
+
+    def __len__(self) -> int:
+        return len(self.matches)
+
+    def points(self) -> int:
+        """Return total points of the cards, see `part1`"""
+        if self.winning is None:
+            return sum(2 ** (m - 1) for m in self.matches if m)
+        m = self.matches
+        if m.max(initial=0) > 62:
+            # Scores past 2**62 would wrap in int64
+            return sum(2 ** (int(x) - 1) for x in m if x)
+        np = _numpy()
+        return int(np.where(m > 0, 1 << np.maximum(m - 1, 0), 0).sum())
+
+    def cards(self) -> int:
+        """Return total scratchcards won, see `part2`"""
+        # Copies depend on the copies of previous cards, so this pass stays
+        # sequential over the vectorized match counts
+        matches = self.matches
+        if self.winning is not None:
+            matches = matches.tolist()
+        return total_cards(matches)
+
+
+# Per-line kernels for line-independent parts, see mapreduce.py
+KERNELS = {"part1": card_score}
 
 
 if __name__ == "__main__":
+    from inputs import get_data
+
     data = get_data(year=2023, day=4).splitlines()
     print(part1(data))
     print(part2(data))
@@ -1,7 +1,12 @@
-from typing import Tuple, List
+import bisect
+import os
+from array import array
+from typing import Iterable, Iterator, Optional, Sequence, Tuple, List
 from collections import defaultdict, namedtuple
 
-from aocd import get_data
+import input_cache
+import profiling
+from profiling import phase, profiled
 
 
 PUZZLE = namedtuple(
@@ -30,6 +35,14 @@ class PuzzleDict(defaultdict):
         self.source_map = dict(
             sorted({r[1]: (r[0], r[2]) for r in ranges}.items())
         )  # source: (dest, length)
+        # sorted (dest, source, length) and bounds for inverse lookups
+        self.dest_map = sorted(
+            (dest, source, length)
+            for source, (dest, length) in self.source_map.items()
+        )
+        self.dest_starts = [dest for dest, _, _ in self.dest_map]
+        self.source_starts = list(self.source_map)
+        self.max_length = max((r[2] for r in self.dest_map), default=0)
 
     def smallest_key(self, x: int) -> int:
         """Return smallest key that is bigger than x
@@ -85,9 +98,74 @@ class PuzzleDict(defaultdict):
 
         return mapped_seed_ranges
 
+    def _dest_overlaps(
+        self, start: int, end: int
+    ) -> Iterator[Tuple[int, int, int]]:
+        """Yield (dest, source, length) of ranges whose destination
+        overlaps [start, end)"""
+        i = bisect.bisect_right(self.dest_starts, start - self.max_length)
+        for j in range(i, len(self.dest_map)):
+            dest, source, length = self.dest_map[j]
+            if dest >= end:
+                break
+            if start < dest + length:
+                yield dest, source, length
+
+    def _unmapped(self, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """Yield the parts of [start, end) outside of every source range"""
+        i = bisect.bisect_right(self.source_starts, start - self.max_length)
+        for j in range(i, len(self.source_starts)):
+            source = self.source_starts[j]
+            if source >= end:
+                break
+            if start < source:
+                yield start, source
+            start = max(start, source + self.source_map[source][1])
+        if start < end:
+            yield start, end
+
+    def inverse(self, y: int) -> List[int]:
+        """Return every source mapped to destination y, following the
+        half-open ranges of `parse_range`"""
+        sources = [
+            source + (y - dest)
+            for dest, source, _ in self._dest_overlaps(y, y + 1)
+        ]
+        sources.extend(start for start, _ in self._unmapped(y, y + 1))
+        return sorted(sources)
+
+    def inverse_range(
+        self, ranges: List[Tuple[int, int, int]]
+    ) -> List[Tuple[int, int, int]]:  # [(start, end, offset), ...]
+        """Given destination ranges carrying the offset of each value to its
+        location, return the source ranges mapped onto them with offsets
+        updated to the same locations"""
+        preimage = []
+        for start, end, offset in ranges:
+            for dest, source, length in self._dest_overlaps(start, end):
+                ovlp_start = max(start, dest)
+                ovlp_end = min(end, dest + length)
+                preimage.append(
+                    (
+                        ovlp_start - dest + source,
+                        ovlp_end - dest + source,
+                        offset + dest - source,
+                    )
+                )
+            # unmapped sources are their own destination
+            preimage.extend(
+                (gap_start, gap_end, offset)
+                for gap_start, gap_end in self._unmapped(start, end)
+            )
+        return preimage
 
-def parse_input(lines: List[str]) -> PUZZLE:
-    """Extract puzzle attributes from source file"""
+
+profiling.count_calls(
+    PuzzleDict, "__getitem__", "day05.PuzzleDict.__getitem__"
+)
+
+
+def _parse_input(lines: List[str]) -> PUZZLE:
     seeds = list(map(int, lines[0].split("seeds: ")[-1].split()))
     ranges = defaultdict(list)
 
@@ -102,6 +180,27 @@ def parse_input(lines: List[str]) -> PUZZLE:
     return PUZZLE(seeds, *ranges.values())
 
 
+def _encode_puzzle(puzzle: PUZZLE) -> List[array]:
+    return [array("q", puzzle.seeds)] + [
+        array("q", [n for r in ranges for n in r]) for ranges in puzzle[1:]
+    ]
+
+
+def _decode_puzzle(columns: List[array]) -> PUZZLE:
+    return PUZZLE(
+        list(columns[0]),
+        *[list(zip(c[0::3], c[1::3], c[2::3])) for c in columns[1:]],
+    )
+
+
+def parse_input(lines: List[str]) -> PUZZLE:
+    """Extract puzzle attributes from source file"""
+    return input_cache.cached(
+        "day05", lines, _parse_input, _encode_puzzle, _decode_puzzle
+    )
+
+
+@profiled
 def part1(lines: List[str]) -> int:
     """
     The almanac (your puzzle input) lists all of the seeds that need to be planted.
@@ -220,15 +319,18 @@ def part1(lines: List[str]) -> int:
 
     What is the lowest location number that corresponds to any of the initial seed numbers?
     """  # noqa: E501
-    puzzle = parse_input(lines)
-    seeds = puzzle[0]
-    for ranges in puzzle[1:]:
-        mapper = PuzzleDict(ranges)
-        seeds = [mapper[s] for s in seeds]
+    with phase("parse"):
+        puzzle = parse_input(lines)
+    with phase("solve"):
+        seeds = puzzle[0]
+        for ranges in puzzle[1:]:
+            mapper = PuzzleDict(ranges)
+            seeds = [mapper[s] for s in seeds]
 
-    return min(seeds)
+        return min(seeds)
 
 
+@profiled
 def part2(lines: List[int]) -> int:
     """Everyone will starve if you only plant such a small number of seeds.
     Re-reading the almanac, it looks like the seeds: line actually describes
@@ -257,22 +359,154 @@ def part2(lines: List[int]) -> int:
     line of the almanac. What is the lowest location number that corresponds
     to any of the initial seed numbers?
     """
-    puzzle = parse_input(lines)
-    seeds = puzzle[0]
-    seed_ranges = [
-        (start, start + length)
-        for start, length in zip(seeds[::2], seeds[1::2])
-    ]
-
-    for ranges in puzzle[1:]:
+    with phase("parse"):
+        puzzle = parse_input(lines)
+    with phase("solve"):
+        seeds = puzzle[0]
+        seed_ranges = [
+            (start, start + length)
+            for start, length in zip(seeds[::2], seeds[1::2])
+        ]
+
+        for ranges in puzzle[1:]:
+            mapper = PuzzleDict(ranges)
+            seed_ranges = mapper.parse_range(seed_ranges)
+
+        profiling.count("day05.range_fragments", len(seed_ranges))
+        return min([seed[0] for seed in seed_ranges])
+
+
+def seeds_for_location(puzzle: PUZZLE, location: int) -> List[int]:
+    """Return every seed number whose location is the given one"""
+    values = [location]
+    for ranges in reversed(puzzle[1:]):
         mapper = PuzzleDict(ranges)
-        seed_ranges = mapper.parse_range(seed_ranges)
+        values = sorted({x for y in values for x in mapper.inverse(y)})
+    return values
+
+
+@profiled
+def part2_reverse(lines: List[str]) -> int:
+    """Same as `part2`, but pull location segments back to seed space in
+    ascending order and stop at the first one reached from a seed range,
+    instead of mapping every seed range to locations"""
+    with phase("parse"):
+        puzzle = parse_input(lines)
+    with phase("solve"):
+        seeds = puzzle[0]
+        seed_ranges = [
+            (start, start + length)
+            for start, length in zip(seeds[::2], seeds[1::2])
+        ]
+        mappers = [PuzzleDict(ranges) for ranges in puzzle[1:]]
+
+        # Locations of seeds past every range bound are the seeds themselves
+        upper = max(
+            [end for _, end in seed_ranges]
+            + [r[0] + r[2] for ranges in puzzle[1:] for r in ranges]
+            + [r[1] + r[2] for ranges in puzzle[1:] for r in ranges]
+        )
+        bounds = {0, upper}
+        for source, (dest, length) in mappers[-1].source_map.items():
+            bounds.update((source, source + length, dest, dest + length))
+        bounds = sorted(b for b in bounds if b <= upper)
+
+        for start, end in zip(bounds, bounds[1:]):
+            profiling.count("day05.reverse_segments")
+            pieces = [(start, end, 0)]
+            for mapper in reversed(mappers):
+                pieces = mapper.inverse_range(pieces)
+            profiling.count("day05.reverse_fragments", len(pieces))
+            locations = [
+                max(piece_start, seed_start) + offset
+                for piece_start, piece_end, offset in pieces
+                for seed_start, seed_end in seed_ranges
+                if max(piece_start, seed_start) < min(piece_end, seed_end)
+            ]
+            if locations:
+                return min(locations)
+        raise ValueError("no seed ranges")
+
+
+def merge_ranges(ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Return sorted union of [start, end) ranges, empty ones dropped"""
+    merged = []
+    for start, end in sorted(ranges):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+# Map tables of a worker process, set once by the pool initializer
+_mappers: List[PuzzleDict] = []
 
-    print(seed_ranges)
-    return min([seed[0] for seed in seed_ranges])
+
+def _init_mappers(tables: Sequence[List[Tuple[int, int, int]]]) -> None:
+    global _mappers
+    _mappers = [PuzzleDict(ranges) for ranges in tables]
+
+
+def _shard_minimum(shard: List[Tuple[int, int]]) -> int:
+    for mapper in _mappers:
+        shard = mapper.parse_range(shard)
+    return min(start for start, _ in shard)
+
+
+def min_location(
+    seed_ranges: Iterable[Tuple[int, int]],
+    tables: Sequence[List[Tuple[int, int, int]]],
+    workers: Optional[int] = None,
+    shards: Optional[int] = None,
+) -> int:
+    """Return lowest location of the seed ranges, with the sorted ranges
+    split into shards pushed through every map by a process pool. The map
+    tables are sent once to each worker, by the pool initializer."""
+    seed_ranges = merge_ranges(seed_ranges)
+    workers = workers or os.cpu_count() or 1
+    shards = shards or 4 * workers
+    size = max(-(-len(seed_ranges) // shards), 1)
+    chunks = [
+        seed_ranges[i : i + size] for i in range(0, len(seed_ranges), size)
+    ]
+    profiling.count("day05.shards", len(chunks))
+    if workers == 1 or len(chunks) <= 1:
+        _init_mappers(tables)
+        return min(map(_shard_minimum, chunks))
+
+    # Deferred, the pool costs more to import than the rest of the module
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        workers, initializer=_init_mappers, initargs=(tables,)
+    ) as pool:
+        return min(pool.map(_shard_minimum, chunks))
+
+
+@profiled
+def part2_parallel(
+    lines: List[str],
+    workers: Optional[int] = None,
+    shards: Optional[int] = None,
+) -> int:
+    """Same as `part2` on many cores, see `min_location`"""
+    with phase("parse"):
+        puzzle = parse_input(lines)
+    with phase("solve"):
+        seeds = puzzle[0]
+        seed_ranges = [
+            (start, start + length)
+            for start, length in zip(seeds[::2], seeds[1::2])
+        ]
+        return min_location(seed_ranges, puzzle[1:], workers, shards)
 
 
 if __name__ == "__main__":
+    from inputs import get_data
+
     data = get_data(year=2023, day=5).splitlines()
     print(part1(data))
     print(part2(data))
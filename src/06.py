@@ -1,8 +1,9 @@
 from typing import List
 
-from aocd import get_data
+from profiling import phase, profiled
 
 
+@profiled
 def part1(lines: List[str]):
     """
     You will get a fixed amount of time during which your boat has to travel
@@ -60,16 +61,19 @@ def part1(lines: List[str]):
     Determine the number of ways you could beat the record in each race.
     What do you get if you multiply these numbers together?
     """
-    times = list(map(int, lines[0].split("Time: ")[-1].split()))
-    distance = list(map(int, lines[1].split("Distance: ")[-1].split()))
+    with phase("parse"):
+        times = list(map(int, lines[0].split("Time: ")[-1].split()))
+        distance = list(map(int, lines[1].split("Distance: ")[-1].split()))
 
-    acc = 1
-    for t, d in zip(times, distance):
-        acc *= sum([1 if i * (t - i) > d else 0 for i in range(1, t)])
+    with phase("solve"):
+        acc = 1
+        for t, d in zip(times, distance):
+            acc *= sum([1 if i * (t - i) > d else 0 for i in range(1, t)])
 
-    return acc
+        return acc
 
 
+@profiled
 def part2(lines: List[str]) -> int:
     """
     As the race is about to start, you realize the piece of paper with race
@@ -95,13 +99,17 @@ def part2(lines: List[str]) -> int:
 
     How many ways can you beat the record in this one much longer race?
     """
-    t = int("".join(lines[0].split("Time: ")[-1].split()))
-    d = int("".join(lines[1].split("Distance: ")[-1].split()))
-    total = sum([1 if i * (t - i) > d else 0 for i in range(1, t)])
-    return total
+    with phase("parse"):
+        t = int("".join(lines[0].split("Time: ")[-1].split()))
+        d = int("".join(lines[1].split("Distance: ")[-1].split()))
+    with phase("solve"):
+        total = sum([1 if i * (t - i) > d else 0 for i in range(1, t)])
+        return total
 
 
 if __name__ == "__main__":
+    from inputs import get_data
+
     data = get_data(year=2023, day=6).splitlines()
 
     print(part1(data))
@@ -1,9 +1,13 @@
-from typing import List
-from collections import Counter
+from array import array
+from typing import Deque, Dict, List, Tuple
+from collections import Counter, deque
 
-from aocd import get_data
+import input_cache
+import profiling
+from profiling import phase, profiled
 
 
+@profiling.counted("day07.strength")
 def strength(hand_hex: List[str], with_joker: bool = False) -> int:
     """Calculate strength of a hand based on the
     Camel Card rules:
@@ -66,6 +70,33 @@ def strength(hand_hex: List[str], with_joker: bool = False) -> int:
     return int(s, 16)
 
 
+def _parse_hands(lines: List[str]) -> Tuple[List[str], List[int]]:
+    hands, bids = [], []
+    for line in lines:
+        hand, bid = line.split(" ")
+        hands.append(hand)
+        bids.append(int(bid))
+    return hands, bids
+
+
+def _encode_hands(parsed: Tuple[List[str], List[int]]) -> List[array]:
+    hands, bids = parsed
+    return [array("B", " ".join(hands).encode()), array("q", bids)]
+
+
+def _decode_hands(columns: List[array]) -> Tuple[List[str], List[int]]:
+    hands, bids = columns
+    return hands.tobytes().decode().split(), list(bids)
+
+
+def parse_hands(lines: List[str]) -> Tuple[List[str], List[int]]:
+    """Split lines into hands and their bids"""
+    return input_cache.cached(
+        "day07", lines, _parse_hands, _encode_hands, _decode_hands
+    )
+
+
+@profiled
 def part1(lines: List[str]) -> int:
     """
     In Camel Cards, you get a list of hands, and your goal is to order them
@@ -125,15 +156,23 @@ def part1(lines: List[str]) -> int:
     cards = ["A", "K", "Q", "J", "T", "9", "8", "7", "6", "5", "4", "3", "2"]
     card2hex = {k: hex(i).replace("0x", "") for i, k in enumerate(cards[::-1])}
 
-    hands = [line.split(" ") for line in lines]
-    hands.sort(key=lambda x: strength(list(map(lambda x: card2hex[x], x[0]))))
-    total = 0
-    for rank, (_, bid) in enumerate(hands, start=1):
-        total += rank * int(bid)
+    with phase("parse"):
+        hands = list(zip(*parse_hands(lines)))
+    with phase("solve"):
+        hands.sort(
+            key=profiling.counting_key(
+                lambda x: strength(list(map(lambda x: card2hex[x], x[0]))),
+                "day07.sort_comparisons",
+            )
+        )
+        total = 0
+        for rank, (_, bid) in enumerate(hands, start=1):
+            total += rank * bid
 
-    return total
+        return total
 
 
+@profiled
 def part2(lines: List[str]) -> int:
     """
     To make things a little more interesting, the Elf introduces one
@@ -170,20 +209,179 @@ def part2(lines: List[str]) -> int:
     ]
     card2hex = {k: hex(i).replace("0x", "") for i, k in enumerate(cards[::-1])}
 
-    hands = [line.split(" ") for line in lines]
-    hands.sort(
-        key=lambda x: strength(
-            list(map(lambda x: card2hex[x], x[0])), with_joker=True
+    with phase("parse"):
+        hands = list(zip(*parse_hands(lines)))
+    with phase("solve"):
+        hands.sort(
+            key=profiling.counting_key(
+                lambda x: strength(
+                    list(map(lambda x: card2hex[x], x[0])), with_joker=True
+                ),
+                "day07.sort_comparisons",
+            )
         )
-    )
-    total = 0
-    for rank, (_, bid) in enumerate(hands, start=1):
-        total += rank * int(bid)
+        total = 0
+        for rank, (_, bid) in enumerate(hands, start=1):
+            total += rank * bid
+
+        return total
+
+
+class FenwickTree:
+    """Sparse Fenwick (binary indexed) tree of sums over keys in [0, size),
+    only the nodes touched by updates are stored. A power of two size
+    doubles as needed to fit larger keys."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.tree: Dict[int, int] = {}
+
+    def add(self, key: int, value: int) -> None:
+        """Add value at key"""
+        while key >= self.size:
+            # The new root covers [0, 2 * size), of which only the old root
+            # range [0, size) holds values
+            self.tree[2 * self.size] = self.tree.get(self.size, 0)
+            self.size *= 2
+        i = key + 1
+        while i <= self.size:
+            self.tree[i] = self.tree.get(i, 0) + value
+            i += i & -i
+
+    def prefix(self, key: int) -> int:
+        """Return sum of values at keys [0, key]"""
+        total = 0
+        i = min(key + 1, self.size)
+        while i > 0:
+            total += self.tree.get(i, 0)
+            i -= i & -i
+        return total
+
+
+class TieGroup:
+    """Bids of identical hands in insertion order, with the count and bid
+    sum of the hands inserted before or after any of them in O(log n)"""
+
+    def __init__(self):
+        self.inserted = 0
+        self.counts = FenwickTree(1)  # by insertion number
+        self.bids = FenwickTree(1)
+        self.bid_total = 0
+        self.order: Dict[int, Deque[int]] = {}  # bid: insertion numbers
+
+    def append(self, bid: int) -> None:
+        self.counts.add(self.inserted, 1)
+        self.bids.add(self.inserted, bid)
+        self.bid_total += bid
+        self.order.setdefault(bid, deque()).append(self.inserted)
+        self.inserted += 1
+
+    def pop(self, bid: int) -> Tuple[int, int]:
+        """Remove the first inserted hand with that bid, return the number
+        of hands inserted before it and the bids of those inserted after"""
+        seqs = self.order.get(bid)
+        if not seqs:
+            raise KeyError(bid)
+        seq = seqs.popleft()
+        if not seqs:
+            del self.order[bid]
+        before = self.counts.prefix(seq - 1)
+        after = self.bid_total - self.bids.prefix(seq)
+        self.counts.add(seq, -1)
+        self.bids.add(seq, -bid)
+        self.bid_total -= bid
+        return before, after
+
+
+class LiveRanking:
+    """Total winnings of a changing set of hands, updated in O(log n) per
+    inserted or removed hand instead of re-sorting every hand.
+
+    Hands are keyed by their packed `strength` in a Fenwick tree of hand
+    counts and one of bids. Inserting a hand of rank r adds r * bid plus
+    the bids of every stronger hand, whose ranks all move up by one;
+    removing it does the reverse. Identical hands rank in insertion order,
+    like the stable sort of `part1`/`part2`.
+    """
 
-    return total
+    KEY_SPACE = 1 << 24  # type digit and five card digits in base-16
+
+    def __init__(self, with_joker: bool = False):
+        cards = "AKQ" + ("T98765432J" if with_joker else "JT98765432")
+        self.card2hex = {
+            k: hex(i).replace("0x", "") for i, k in enumerate(cards[::-1])
+        }
+        self.with_joker = with_joker
+        self.counts = FenwickTree(self.KEY_SPACE)
+        self.bids = FenwickTree(self.KEY_SPACE)
+        self.ties: Dict[int, TieGroup] = {}
+        self.bid_total = 0
+        self.total = 0
+
+    def __len__(self) -> int:
+        return self.counts.prefix(self.KEY_SPACE - 1)
+
+    def key(self, hand: str) -> int:
+        return strength(
+            [self.card2hex[card] for card in hand], with_joker=self.with_joker
+        )
+
+    def add(self, hand: str, bid: int) -> int:
+        """Insert a hand, return the updated total winnings"""
+        key = self.key(hand)
+        rank = self.counts.prefix(key) + 1
+        stronger = self.bid_total - self.bids.prefix(key)
+        self.total += rank * bid + stronger
+
+        self.counts.add(key, 1)
+        self.bids.add(key, bid)
+        self.bid_total += bid
+        self.ties.setdefault(key, TieGroup()).append(bid)
+        return self.total
+
+    def remove(self, hand: str, bid: int) -> int:
+        """Remove the first inserted hand with that bid, return the updated
+        total winnings"""
+        key = self.key(hand)
+        tied = self.ties.get(key)
+        if tied is None or bid not in tied.order:
+            raise KeyError(f"{hand} {bid}")
+        position, later = tied.pop(bid)
+        # Identical hands inserted later than this one move down one rank
+        rank = self.counts.prefix(key - 1) + position + 1
+        stronger = self.bid_total - self.bids.prefix(key)
+        self.total -= rank * bid + stronger + later
+
+        if not tied.order:
+            del self.ties[key]
+        self.counts.add(key, -1)
+        self.bids.add(key, -bid)
+        self.bid_total -= bid
+        return self.total
+
+
+class LiveWinnings:
+    """Keep the total winnings without and with jokers (the answers of
+    `part1` and `part2`) while hands arrive and leave"""
+
+    def __init__(self):
+        self.plain = LiveRanking(with_joker=False)
+        self.joker = LiveRanking(with_joker=True)
+
+    def add(self, hand: str, bid: int) -> Tuple[int, int]:
+        return self.plain.add(hand, bid), self.joker.add(hand, bid)
+
+    def remove(self, hand: str, bid: int) -> Tuple[int, int]:
+        return self.plain.remove(hand, bid), self.joker.remove(hand, bid)
+
+    @property
+    def totals(self) -> Tuple[int, int]:
+        return self.plain.total, self.joker.total
 
 
 if __name__ == "__main__":
+    from inputs import get_data
+
     data = get_data(year=2023, day=7).splitlines()
     print(part1(data))
     print(part2(data))
@@ -1,9 +1,426 @@
 import math
-from typing import Dict, List
+import struct
+from array import array
+from collections import namedtuple
+from typing import Dict, List, Sequence, Tuple
 
-from aocd import get_data
+import input_cache
+import profiling
+from days import numpy as _numpy
+from profiling import phase, profiled
 
 
+# Nodes are numbered by their line order and identified by the base-36 code
+# of their name, left/right hold successor indexes
+NETWORK = namedtuple("Network", ["instructions", "codes", "left", "right"])
+NAME_SPACE = 36**3  # three character names of digits and capitals
+LINE = "AAA = (BBB, CCC)"
+OFFSETS = (0, 7, 12)  # node, left and right name offsets in a line
+SEPARATORS = (3, 4, 5, 6, 10, 11, 15)  # offsets of " = (", ", " and ")"
+NAME_CHARS = frozenset("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+
+def _parse_fixed_numpy(nodes: List[str]):
+    """Parse fixed width node lines at fixed offsets of a single bytes
+    block, returns None if the lines are not all fixed width"""
+    np = _numpy()
+    stride = len(LINE) + 1
+    block = ("\n".join(nodes) + "\n").encode()
+    if len(block) != stride * len(nodes):
+        return None
+    rows = np.frombuffer(block, dtype=np.uint8).reshape(-1, stride)
+    template = np.frombuffer((LINE + "\n").encode(), dtype=np.uint8)
+    separators = list(SEPARATORS) + [len(LINE)]  # and the newline
+    if (rows[:, separators] != template[separators]).any():
+        return None
+
+    digits = np.full(256, -1, dtype=np.int64)
+    digits[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(10)
+    digits[np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype=np.uint8)] = (
+        np.arange(10, 36)
+    )
+    names = [digits[rows[:, offset : offset + 3]] for offset in OFFSETS]
+    if any((name < 0).any() for name in names):
+        return None
+    codes = [name @ np.array([1296, 36, 1]) for name in names]
+
+    # Dense index of every name through a table over the whole name space
+    index = np.full(NAME_SPACE, -1, dtype=np.int64)
+    index[codes[0]] = np.arange(len(nodes))
+    left, right = index[codes[1]], index[codes[2]]
+    if (left < 0).any() or (right < 0).any():
+        raise KeyError("node has an undefined successor")
+    return [array("q", c.tobytes()) for c in (codes[0], left, right)]
+
+
+def _parse_fixed(nodes: List[str]):
+    """Pure python version of `_parse_fixed_numpy`"""
+    for line in nodes:
+        if (
+            len(line) != len(LINE)
+            or any(line[i] != LINE[i] for i in SEPARATORS)
+            or not NAME_CHARS.issuperset(
+                line[offset + i] for offset in OFFSETS for i in range(3)
+            )
+        ):
+            return None
+    codes, left_codes, right_codes = (
+        array("q", [int(line[offset : offset + 3], 36) for line in nodes])
+        for offset in OFFSETS
+    )
+    index = array("q", [-1]) * NAME_SPACE
+    for i, code in enumerate(codes):
+        index[code] = i
+    left = array("q", [index[code] for code in left_codes])
+    right = array("q", [index[code] for code in right_codes])
+    if -1 in left or -1 in right:
+        raise KeyError("node has an undefined successor")
+    return [codes, left, right]
+
+
+def _parse_network(lines: List[str]) -> NETWORK:
+    nodes = lines[2:]
+    parse = _parse_fixed_numpy if _numpy() is not None else _parse_fixed
+    parsed = parse(nodes) if nodes else None
+    if parsed is None:
+        # Irregular lines, split each of them
+        paths = []
+        codes = array("q")
+        for line in nodes:
+            key, path = line.split(" = ")
+            codes.append(int(key, 36))
+            paths.append(path.strip("()").split(", "))
+        index = {code: i for i, code in enumerate(codes)}
+        parsed = [
+            codes,
+            array("q", [index[int(path[0], 36)] for path in paths]),
+            array("q", [index[int(path[1], 36)] for path in paths]),
+        ]
+    return NETWORK(lines[0], *parsed)
+
+
+def _encode_network(network: NETWORK) -> List[array]:
+    return [
+        array("B", network.instructions.encode()),
+        network.codes,
+        network.left,
+        network.right,
+    ]
+
+
+def _decode_network(columns: List[array]) -> NETWORK:
+    instructions, codes, left, right = columns
+    return NETWORK(instructions.tobytes().decode(), codes, left, right)
+
+
+def parse_network(lines: List[str]) -> NETWORK:
+    """Parse instructions and the node network into successor arrays"""
+    return input_cache.cached(
+        "day08-v2", lines, _parse_network, _encode_network, _decode_network
+    )
+
+
+def node_name(code: int) -> str:
+    """Return three character name of a base-36 node code"""
+    name = ""
+    for _ in range(3):
+        code, digit = divmod(code, 36)
+        name = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"[digit] + name
+    return name
+
+
+def name_mask(network: NETWORK, name: str, suffix: bool) -> List[bool]:
+    """Return per node whether its name is `name`, or ends with it if
+    `suffix`, compared on the base-36 codes"""
+    target = int(name, 36)
+    if not suffix:
+        return [code == target for code in network.codes]
+    modulo = 36 ** len(name)
+    return [code % modulo == target for code in network.codes]
+
+
+def count_steps(network: NETWORK, start: int, ends: Sequence[bool]) -> int:
+    """Return number of steps from start node index to the first end node"""
+    ins2idx = {"L": 0, "R": 1}
+    successors = (network.left, network.right)
+    moves = [successors[ins2idx[ins]] for ins in network.instructions]
+
+    step = 0
+    state = start
+    while True:
+        state = moves[step % len(moves)][state]
+        step += 1
+
+        if ends[state]:
+            profiling.count("day08.steps", step)
+            return step
+
+
+class DistanceTable:
+    """Steps to the next end node from every (node, instruction index)
+    state, for O(1) queries from any start.
+
+    State `node * period + k` is at `node` about to follow instruction `k`.
+    Every state has a single successor, so the distances are filled by a
+    breadth-first search from the end states over the predecessor graph,
+    stored in CSR form. `dist[s]` is the number of steps (at least one) to
+    the next state on an end node and `hit[s]` that state, both -1 if no
+    end node is ever reached.
+    """
+
+    HEADER = struct.Struct("<4sQQ")  # magic, nodes, instructions
+    MAGIC = b"D08T"
+
+    def __init__(self, nodes: int, period: int, dist: array, hit: array):
+        self.nodes = nodes
+        self.period = period
+        self.dist = dist
+        self.hit = hit
+
+    @classmethod
+    def build(cls, network: NETWORK, ends: Sequence[bool]) -> "DistanceTable":
+        n, m = len(network.codes), len(network.instructions)
+        size = n * m
+        successors = {"L": network.left, "R": network.right}
+        nxt = array("q", bytes(8 * size))
+        for k, ins in enumerate(network.instructions):
+            succ, k_next = successors[ins], (k + 1) % m
+            for node in range(n):
+                nxt[node * m + k] = succ[node] * m + k_next
+
+        # Predecessors of every state in CSR form
+        indptr = array("q", bytes(8 * (size + 1)))
+        for t in nxt:
+            indptr[t + 1] += 1
+        for s in range(size):
+            indptr[s + 1] += indptr[s]
+        fill = array("q", indptr)
+        preds = array("q", bytes(8 * size))
+        for s, t in enumerate(nxt):
+            preds[fill[t]] = s
+            fill[t] += 1
+
+        # Steps to reach an end state, zero from the end states themselves
+        reach = array("q", [-1]) * size
+        target = array("q", [-1]) * size
+        queue = array("q")
+        for node, is_end in enumerate(ends):
+            if is_end:
+                for s in range(node * m, node * m + m):
+                    reach[s], target[s] = 0, s
+                    queue.append(s)
+        head = 0
+        while head < len(queue):
+            u = queue[head]
+            head += 1
+            for i in range(indptr[u], indptr[u + 1]):
+                p = preds[i]
+                if reach[p] < 0:
+                    reach[p], target[p] = reach[u] + 1, target[u]
+                    queue.append(p)
+        profiling.count("day08.table_states", size)
+
+        dist = array("q", [reach[t] + 1 if reach[t] >= 0 else -1 for t in nxt])
+        hit = array("q", [target[t] for t in nxt])
+        return cls(n, m, dist, hit)
+
+    def to_bytes(self) -> bytes:
+        return (
+            self.HEADER.pack(self.MAGIC, self.nodes, self.period)
+            + self.dist.tobytes()
+            + self.hit.tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DistanceTable":
+        if len(data) < cls.HEADER.size:
+            raise ValueError("distance table is truncated")
+        magic, nodes, period = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError("not a day 08 distance table")
+        size = nodes * period
+        offset = cls.HEADER.size
+        if len(data) < offset + 16 * size:
+            raise ValueError("distance table is truncated")
+        dist, hit = array("q"), array("q")
+        dist.frombytes(data[offset : offset + 8 * size])
+        hit.frombytes(data[offset + 8 * size : offset + 16 * size])
+        return cls(nodes, period, dist, hit)
+
+    def state(self, node: int, k: int = 0) -> int:
+        return node * self.period + k % self.period
+
+    def next_hit(self, state: int) -> Tuple[int, int]:
+        """Return steps to the next end state and that state"""
+        return self.dist[state], self.hit[state]
+
+    def steps(self, node: int) -> int:
+        """Return steps from node at the first instruction to an end node"""
+        return self.dist[self.state(node)]
+
+    def hits(self, node: int) -> Tuple[List[int], List[int], int]:
+        """Return the steps at which a ghost starting at node is on an end
+        node: hits before its cycle, hits in its first cycle and the cycle
+        length, which is 0 if it stops hitting end nodes"""
+        times, seen = [], {}
+        time, state = 0, self.state(node)
+        while True:
+            steps, state = self.next_hit(state)
+            if steps < 0:
+                return times, [], 0
+            time += steps
+            if state in seen:
+                first = seen[state]
+                return times[:first], times[first:], time - times[first]
+            seen[state] = len(times)
+            times.append(time)
+
+    def all_on_end(self, nodes: Sequence[int]) -> int:
+        """Return the first step at which ghosts starting at every node are
+        all on end nodes, raises ValueError if that never happens"""
+        # Hit times as (first, period) progressions, period 0 for one hit
+        candidates = None
+        for node in nodes:
+            prefix, cycle, period = self.hits(node)
+            ghost = [(t, 0) for t in prefix] + [(t, period) for t in cycle]
+            if candidates is None:
+                candidates = ghost
+                continue
+            merged = []
+            for a in candidates:
+                for b in ghost:
+                    both = _intersect(a, b)
+                    if both is not None:
+                        merged.append(both)
+            candidates = merged
+        if not candidates:
+            raise ValueError("ghosts are never all on end nodes")
+        return min(first for first, _ in candidates)
+
+
+def _intersect(a: Tuple[int, int], b: Tuple[int, int]):
+    """Return the common steps of two (first, period) progressions as a
+    progression, or None if there are none"""
+    (first_a, period_a), (first_b, period_b) = sorted(
+        [a, b], key=lambda x: x[1]
+    )
+    if period_a == 0:
+        if first_a >= first_b and (
+            first_a == first_b
+            if period_b == 0
+            else (first_a - first_b) % period_b == 0
+        ):
+            return first_a, 0
+        return None
+    # Chinese remainder theorem for non coprime periods
+    g = math.gcd(period_a, period_b)
+    if (first_b - first_a) % g:
+        return None
+    lcm = period_a // g * period_b
+    k = (first_b - first_a) // g * pow(period_a // g, -1, period_b // g)
+    t = (first_a + period_a * (k % (period_b // g))) % lcm
+    lowest = max(first_a, first_b)
+    if t < lowest:
+        t += -(-(lowest - t) // lcm) * lcm
+    return t, lcm
+
+
+def part2_table(lines: List[str]) -> int:
+    """Same as `part2`, with the first end node hits read from a
+    `DistanceTable`"""
+    network = parse_network(lines)
+    table = DistanceTable.build(network, name_mask(network, "Z", suffix=True))
+    starts = name_mask(network, "A", suffix=True)
+    return math.lcm(
+        *(table.steps(node) for node, start in enumerate(starts) if start)
+    )
+
+
+def lockstep_hits(
+    network: NETWORK, starts: Sequence[int], ends: Sequence[bool]
+) -> Tuple[List[int], List[int]]:
+    """Walk every ghost at once and return per ghost the step of its first
+    end node hit and the length of the cycle its end node hits repeat
+    with, as in `DistanceTable.hits`.
+
+    Current nodes of all ghosts are kept in one NumPy array advanced by a
+    single gather from the successor array of each instruction, with hits
+    read from a boolean end mask. Without NumPy the same walk runs over
+    lists. The cycle length is the distance between two hits in the same
+    (node, instruction index) state, which happens within twice as many
+    steps as there are states for a ghost that hits end nodes at all,
+    otherwise ValueError is raised.
+    """
+    np = _numpy()
+    m = len(network.instructions)
+    limit = 2 * len(network.codes) * m
+    first = [0] * len(starts)
+    cycle = [0] * len(starts)
+    seen: List[Dict[int, int]] = [{} for _ in starts]  # hit state: step
+
+    def hit(ghost: int, node: int, step: int) -> bool:
+        """Record a hit, return whether the ghost's cycle is now known"""
+        state = node * m + step % m
+        if state in seen[ghost]:
+            cycle[ghost] = step - seen[ghost][state]
+            return True
+        seen[ghost][state] = step
+        first[ghost] = first[ghost] or step
+        return False
+
+    step = 0
+    if np is not None:
+        successors = np.stack(
+            [
+                np.frombuffer(network.left, dtype=np.int64),
+                np.frombuffer(network.right, dtype=np.int64),
+            ]
+        )
+        moves = [successors[int(ins == "R")] for ins in network.instructions]
+        is_end = np.asarray(ends, dtype=bool)
+        nodes = np.asarray(starts, dtype=np.int64)
+        walking = np.ones(len(starts), dtype=bool)
+        while step < limit and walking.any():
+            nodes = moves[step % m][nodes]
+            step += 1
+            hits = is_end[nodes] & walking
+            if hits.any():
+                for ghost in np.flatnonzero(hits).tolist():
+                    if hit(ghost, int(nodes[ghost]), step):
+                        walking[ghost] = False
+    else:
+        moves = [
+            network.right if ins == "R" else network.left
+            for ins in network.instructions
+        ]
+        nodes = list(starts)
+        while step < limit and not all(cycle):
+            move = moves[step % m]
+            nodes = [move[node] for node in nodes]
+            step += 1
+            for ghost, node in enumerate(nodes):
+                if ends[node] and not cycle[ghost]:
+                    hit(ghost, node, step)
+    profiling.count("day08.lockstep_steps", step)
+
+    if not all(cycle):
+        raise ValueError("a ghost never reaches an end node")
+    return first, cycle
+
+
+def part2_lockstep(lines: List[str]) -> int:
+    """Same as `part2`, walking all ghosts in lockstep"""
+    network = parse_network(lines)
+    starts = name_mask(network, "A", suffix=True)
+    first, _ = lockstep_hits(
+        network,
+        [node for node, start in enumerate(starts) if start],
+        name_mask(network, "Z", suffix=True),
+    )
+    return math.lcm(*first)
+
+
+@profiled
 def part1(lines: List[str], start: str = "AAA", end: str = "ZZZ") -> int:
     """
     It seems like you're meant to use the left/right instructions to
@@ -39,24 +456,17 @@ def part1(lines: List[str], start: str = "AAA", end: str = "ZZZ") -> int:
     Starting at AAA, follow the left/right instructions.
     How many steps are required to reach ZZZ?
     """
-    instructions = lines[0]
-    ins2idx = {"L": 0, "R": 1}
-    step = 0
-    puzzle: Dict[str, List[str]] = {}
-    for line in lines[2:]:
-        key, paths = line.split(" = ")
-        puzzle[key] = paths.strip("()").split(", ")
-
-    state = start
-    while True:
-        ins = instructions[step % len(instructions)]
-        step += 1
-        state = puzzle[state][ins2idx[ins]]
-
-        if state == end or (end != "ZZZ" and state.endswith(end)):
-            return step
+    with phase("parse"):
+        network = parse_network(lines)
+    with phase("solve"):
+        return count_steps(
+            network,
+            network.codes.index(int(start, 36)),
+            name_mask(network, end, suffix=end != "ZZZ"),
+        )
 
 
+@profiled
 def part2(lines: List[str]):
     """The sandstorm is upon you and you aren't any closer to escaping the
     wasteland. You had the camel follow the instructions, but you've barely
@@ -107,20 +517,23 @@ def part2(lines: List[str]):
     Simultaneously start on every node that ends with A. How many steps does
     it take before you're only on nodes that end with Z?
     """
-    starts = []
-    steps = []
-    for line in lines[2:]:
-        key = line.split(" = ")[0]
-        if key.endswith("A"):
-            starts.append(key)
+    with phase("parse"):
+        network = parse_network(lines)
+    with phase("solve"):
+        starts = name_mask(network, "A", suffix=True)
+        ends = name_mask(network, "Z", suffix=True)
+        steps = [
+            count_steps(network, start, ends)
+            for start, is_start in enumerate(starts)
+            if is_start
+        ]
 
-    for start in starts:
-        steps.append(part1(lines, start, "Z"))
-
-    return math.lcm(*steps)
+        return math.lcm(*steps)
 
 
 if __name__ == "__main__":
+    from inputs import get_data
+
     data = get_data(year=2023, day=8).splitlines()
     print(part1(data))
     print(part2(data))
@@ -0,0 +1,120 @@
+"""Solve many puzzle inputs of a day in a pool of warmed-up workers.
+
+Each worker process imports the day module once, in the pool initializer,
+and then solves input after input, so interpreter and import startup are
+paid once per worker rather than once per input. Inputs come from a
+directory (every regular file, sorted by name) or a manifest listing one
+path per line, relative to the manifest. Results stream to stdout as JSON
+lines, in completion order, with per-input timings in seconds:
+
+    python src/batch.py 5 inputs/ --workers 8 > results.jsonl
+    python src/batch.py 5 --manifest inputs.txt
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import days
+
+PARTS = ("part1", "part2")
+
+_module: Optional[ModuleType] = None
+
+
+def _init_worker(day: int) -> None:
+    global _module
+    _module = days.load(day)
+
+
+def list_inputs(
+    directory: Optional[str] = None, manifest: Optional[str] = None
+) -> List[str]:
+    """Return input paths of a directory or listed in a manifest, blank
+    lines and lines starting with # are skipped in manifests"""
+    if manifest:
+        base = os.path.dirname(manifest)
+        with open(manifest) as f:
+            return [
+                os.path.join(base, line.strip())
+                for line in f
+                if line.strip() and not line.startswith("#")
+            ]
+    return sorted(
+        entry.path
+        for entry in os.scandir(directory)
+        if entry.is_file() and not entry.name.startswith(".")
+    )
+
+
+def solve_input(path: str, parts: Sequence[str] = PARTS) -> Dict[str, Any]:
+    """Solve the parts of one input with the worker's module, failures are
+    reported in the result instead of raised"""
+    result: Dict[str, Any] = {"input": path, "pid": os.getpid()}
+    start = time.perf_counter()
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+        result["read_s"] = round(time.perf_counter() - start, 6)
+        for part in parts:
+            start = time.perf_counter()
+            result[part] = getattr(_module, part)(lines)
+            result[f"{part}_s"] = round(time.perf_counter() - start, 6)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def solve_batch(
+    day: int,
+    paths: Sequence[str],
+    parts: Sequence[str] = PARTS,
+    workers: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield the result of every input as soon as it is solved"""
+    workers = min(workers or os.cpu_count() or 1, max(len(paths), 1))
+    if workers == 1:
+        _init_worker(day)
+        for path in paths:
+            yield solve_input(path, parts)
+        return
+
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(day,)
+    ) as pool:
+        futures = [pool.submit(solve_input, path, parts) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("day", type=int)
+    parser.add_argument("directory", nargs="?")
+    parser.add_argument("--manifest", default=None)
+    parser.add_argument("--parts", nargs="+", choices=PARTS, default=PARTS)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    if bool(args.directory) == bool(args.manifest):
+        parser.error("give either a directory or --manifest")
+
+    paths = list_inputs(args.directory, args.manifest)
+    start = time.perf_counter()
+    errors = 0
+    for result in solve_batch(args.day, paths, args.parts, args.workers):
+        errors += "error" in result
+        print(json.dumps(result), flush=True)
+    print(
+        f"{len(paths)} inputs, {errors} errors "
+        f"in {time.perf_counter() - start:.2f}s",
+        file=sys.stderr,
+    )
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""Helpers shared by the day modules, whose file names are not valid
+identifiers."""
+import functools
+import importlib
+from types import ModuleType
+from typing import Optional
+
+DAYS = range(1, 9)
+
+
+def load(day: int) -> ModuleType:
+    """Import and return the solver module of the given day"""
+    return importlib.import_module(f"{day:02d}")
+
+
+@functools.lru_cache(maxsize=None)
+def numpy() -> Optional[ModuleType]:
+    """Return numpy if installed, imported on first use to keep startup fast"""
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover - numpy is optional
+        return None
+    return numpy
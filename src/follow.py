@@ -0,0 +1,151 @@
+"""Follow an append-only input file and keep line-independent answers live.
+
+For parts whose answer is a sum over lines (the `KERNELS` of days 01, 02
+and 04), only lines appended since the last read are consumed and added to
+running totals, reading at most `Follower.BLOCK` bytes at a time. Totals
+and the byte offset of the first unread line are checkpointed after every
+block, so a restart resumes without rescanning.
+A file that shrinks or is replaced is rescanned from the start.
+
+    python src/follow.py 1 input.txt [--state input.txt.follow.json]
+"""
+import argparse
+import json
+import os
+import time
+from typing import Dict, Optional
+
+import days
+
+
+class Follower:
+    """Running totals of every per-line kernel of a day over a growing
+    file"""
+
+    BLOCK = 64 << 20  # bytes read at a time, each followed by a checkpoint
+
+    def __init__(self, day: int, path: str, state_path: Optional[str] = None):
+        self.day = day
+        self.path = path
+        self.state_path = state_path or f"{path}.follow.json"
+        self.kernels = days.load(day).KERNELS
+        self.offset = 0
+        self.inode = None
+        self.lines = 0
+        self.totals = {part: 0 for part in self.kernels}
+        self._load_checkpoint()
+
+    def _reset(self) -> None:
+        self.offset = 0
+        self.lines = 0
+        self.totals = {part: 0 for part in self.kernels}
+
+    def _load_checkpoint(self) -> None:
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        if state.get("day") != self.day or set(state["totals"]) != set(
+            self.kernels
+        ):
+            return
+        self.offset = state["offset"]
+        self.inode = state["inode"]
+        self.lines = state["lines"]
+        self.totals = state["totals"]
+
+    def checkpoint(self) -> None:
+        """Atomically persist the running state"""
+        state = {
+            "day": self.day,
+            "path": os.path.abspath(self.path),
+            "offset": self.offset,
+            "inode": self.inode,
+            "lines": self.lines,
+            "totals": self.totals,
+        }
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_path)
+
+    def poll(self) -> Optional[Dict[str, int]]:
+        """Consume complete lines appended since the last poll, return the
+        updated totals or None if there were none"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            # Replaced or truncated, start over
+            self._reset()
+            self.inode = stat.st_ino
+        if stat.st_size == self.offset:
+            return None
+
+        updated = False
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            remaining = stat.st_size - self.offset
+            partial = b""
+            while remaining > 0:
+                block = f.read(min(self.BLOCK, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                # Carry a partial last line over to the next block, or to
+                # the next poll if it is still being written
+                chunk = partial + block
+                end = chunk.rfind(b"\n") + 1
+                partial = chunk[end:]
+                if end == 0:
+                    continue
+
+                for line in chunk[:end].decode().splitlines():
+                    if not line:
+                        continue
+                    self.lines += 1
+                    for part, kernel in self.kernels.items():
+                        self.totals[part] += kernel(line)
+                self.offset += end
+                self.checkpoint()
+                updated = True
+        return dict(self.totals) if updated else None
+
+    def follow(self, interval: float = 1.0):
+        """Yield updated totals as lines get appended"""
+        while True:
+            totals = self.poll()
+            if totals is not None:
+                yield totals
+            time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("day", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--state", default=None)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument(
+        "--once", action="store_true", help="consume new lines and exit"
+    )
+    args = parser.parse_args()
+
+    if not hasattr(days.load(args.day), "KERNELS"):
+        parser.error(f"day {args.day} has no per-line kernels")
+    follower = Follower(args.day, args.path, args.state)
+    if args.once:
+        follower.poll()
+        print(json.dumps({"lines": follower.lines, **follower.totals}))
+        return
+    try:
+        for totals in follower.follow(args.interval):
+            print(json.dumps({"lines": follower.lines, **totals}), flush=True)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Persistent on-disk cache of parsed puzzle inputs.
+
+Each day converts its parsed structure into a list of typed `array`
+columns which are written in a compact binary layout (no pickle), keyed by
+a hash of the raw input. The cache is enabled by pointing `AOC_CACHE_DIR`
+to a directory; `AOC_CACHE_MAX_BYTES` bounds its total size, evicting the
+least recently used entries first.
+"""
+import os
+import struct
+from array import array
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+MAGIC = b"AOC1"
+HEADER = struct.Struct("<4sI")  # magic, number of columns
+COLUMN = struct.Struct("<cQ")  # typecode, number of items
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def cache_dir() -> Optional[str]:
+    """Return cache directory from environment, None if caching is off"""
+    directory = os.environ.get("AOC_CACHE_DIR")
+    if not directory:
+        return None
+    directory = os.path.expanduser(directory)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def input_key(name: str, lines: Sequence[str]) -> str:
+    """Return cache key of a day's parsed structure for the given input"""
+    import hashlib  # only needed once caching is enabled
+
+    digest = hashlib.sha256(name.encode())
+    digest.update("\n".join(lines).encode())
+    return f"{name}-{digest.hexdigest()[:32]}"
+
+
+def dump(columns: Sequence[array], path: str) -> None:
+    """Write columns to path atomically"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(columns)))
+        for column in columns:
+            f.write(COLUMN.pack(column.typecode.encode(), len(column)))
+            f.write(column.tobytes())
+    os.replace(tmp, path)
+
+
+def load(path: str) -> List[array]:
+    """Read columns written by `dump`"""
+    with open(path, "rb") as f:
+        buffer = f.read()
+    magic, count = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a cache file")
+    offset = HEADER.size
+    columns = []
+    for _ in range(count):
+        typecode, length = COLUMN.unpack_from(buffer, offset)
+        offset += COLUMN.size
+        column = array(typecode.decode())
+        end = offset + length * column.itemsize
+        if end > len(buffer):
+            raise ValueError(f"{path} is truncated")
+        column.frombytes(buffer[offset:end])
+        columns.append(column)
+        offset = end
+    return columns
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def evict(directory: str, max_bytes: int) -> None:
+    """Remove least recently used entries until directory fits max_bytes"""
+    entries = []
+    for entry in os.scandir(directory):
+        if not entry.name.endswith(".bin"):
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_bytes:
+            break
+        _remove(path)
+        total -= size
+
+
+def cached(
+    name: str,
+    lines: Sequence[str],
+    parse: Callable[[Sequence[str]], T],
+    encode: Callable[[T], Sequence[array]],
+    decode: Callable[[List[array]], T],
+) -> T:
+    """Return parse(lines), reusing the cached columns of a previous parse
+    of the same input when the cache is enabled.
+    """
+    directory = cache_dir()
+    if directory is None:
+        return parse(lines)
+
+    path = os.path.join(directory, f"{input_key(name, lines)}.bin")
+    try:
+        columns = load(path)
+    except FileNotFoundError:
+        pass
+    except (ValueError, struct.error):
+        # Corrupted entry, parse again and overwrite
+        _remove(path)
+    else:
+        # Refresh mtime so eviction is least recently used
+        os.utime(path)
+        return decode(columns)
+
+    parsed = parse(lines)
+    dump(encode(parsed), path)
+    max_bytes = int(
+        os.environ.get("AOC_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+    )
+    evict(directory, max_bytes)
+    return parsed
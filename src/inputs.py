@@ -0,0 +1,293 @@
+"""Puzzle input providers for the day scripts.
+
+Solver modules only import this from their `__main__` block, and aocd is
+imported on first use, so importing a day module to call `part1`/`part2` on
+local data never pays for an HTTP stack.
+
+When `AOC_INPUT_URL` is set (e.g. to an internal mirror or the stand-in
+server of `mirror.py`), inputs are fetched by `InputClient` instead of
+aocd. It fetches many (year, day, session) inputs concurrently over a pool
+of keep-alive connections with bounded concurrency, retries and an on-disk
+cache:
+
+    python src/inputs.py --days 1-8 --sessions sessions.txt
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import ssl
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_URL = "https://adventofcode.com"
+DEFAULT_CACHE = os.path.join("~", ".cache", "aoc-2023", "inputs")
+USER_AGENT = "github.com/kiritowu/aoc-2023"
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+INPUT_REQUEST = namedtuple("InputRequest", ["year", "day", "session"])
+
+
+class InputError(Exception):
+    """Raised when an input cannot be fetched"""
+
+
+def default_session() -> str:
+    """Return session token from environment or the aocd token file"""
+    session = os.environ.get("AOC_SESSION")
+    if session:
+        return session.strip()
+    path = os.path.expanduser(os.path.join("~", ".config", "aocd", "token"))
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        raise InputError("no AOC_SESSION or aocd token file found") from None
+
+
+def account_id(session: str) -> str:
+    """Return a stable id of the session's account that does not reveal the
+    token, used in cache paths and logs"""
+    return hashlib.sha256(session.encode()).hexdigest()[:16]
+
+
+class InputClient:
+    """Asyncio client fetching puzzle inputs over pooled HTTP/1.1
+    keep-alive connections.
+
+    At most `concurrency` requests are in flight, each over its own
+    connection, and idle connections are reused by the next request.
+    Failed connections and 429/5xx responses are retried with exponential
+    backoff, fetched inputs are cached under `cache_dir`.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        concurrency: int = 8,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 30.0,
+        cache_dir: Optional[str] = DEFAULT_CACHE,
+    ):
+        base_url = base_url or os.environ.get("AOC_INPUT_URL", DEFAULT_URL)
+        url = urlsplit(base_url)
+        self.https = url.scheme == "https"
+        self.host = url.hostname
+        self.port = url.port or (443 if self.https else 80)
+        self.prefix = url.path.rstrip("/")
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache_dir = cache_dir and os.path.expanduser(cache_dir)
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]
+        self._idle = []
+        self.connections_opened = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self) -> None:
+        """Close every idle connection"""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    def _cache_path(self, year: int, day: int, session: str) -> str:
+        return os.path.join(
+            self.cache_dir,
+            str(year),
+            f"{day:02d}",
+            f"{account_id(session)}.txt",
+        )
+
+    async def _connect(self):
+        if self._idle:
+            return self._idle.pop()
+        self.connections_opened += 1
+        return await asyncio.open_connection(
+            self.host,
+            self.port,
+            ssl=ssl.create_default_context() if self.https else None,
+        )
+
+    async def _request(self, path: str, session: str) -> Tuple[int, bytes]:
+        reader, writer = await self._connect()
+        try:
+            writer.write(
+                (
+                    f"GET {self.prefix}{path} HTTP/1.1\r\n"
+                    f"Host: {self.host}\r\n"
+                    f"Cookie: session={session}\r\n"
+                    f"User-Agent: {USER_AGENT}\r\n"
+                    "Connection: keep-alive\r\n\r\n"
+                ).encode()
+            )
+            await writer.drain()
+            status, headers, body = await asyncio.wait_for(
+                _read_response(reader), self.timeout
+            )
+        except BaseException:
+            writer.close()
+            raise
+
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+        return status, body
+
+    async def fetch(self, year: int, day: int, session: str) -> str:
+        """Return input of the day for the session's account"""
+        path = self.cache_dir and self._cache_path(year, day, session)
+        if path and os.path.exists(path):
+            with open(path) as f:
+                return f.read()
+
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    status, body = await self._request(
+                        f"/{year}/day/{day}/input", session
+                    )
+                except (OSError, asyncio.TimeoutError, EOFError) as e:
+                    error = f"{type(e).__name__}: {e}"
+                else:
+                    if status == 200:
+                        break
+                    error = f"HTTP {status}"
+                    if status not in RETRY_STATUS:
+                        raise InputError(f"{year} day {day}: {error}")
+                if attempt < self.retries:
+                    await asyncio.sleep(self.backoff * 2**attempt)
+            else:
+                raise InputError(f"{year} day {day}: {error}")
+
+        data = body.decode()
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return data
+
+    async def fetch_many(
+        self, requests: Iterable[INPUT_REQUEST]
+    ) -> List[str]:
+        """Return inputs of many requests in order, fetched concurrently"""
+        return await asyncio.gather(
+            *(self.fetch(*request) for request in requests)
+        )
+
+
+async def _read_response(
+    reader: asyncio.StreamReader,
+) -> Tuple[int, Dict[str, str], bytes]:
+    """Read status, headers and body of an HTTP/1.1 response"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise EOFError("connection closed by server")
+    status = int(status_line.split()[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        body = b"".join(chunks)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = await reader.read()
+        headers["connection"] = "close"
+    return status, headers, body
+
+
+def fetch_inputs(requests: Iterable[INPUT_REQUEST], **kwargs) -> List[str]:
+    """Fetch many inputs concurrently, see `InputClient` for kwargs"""
+
+    async def run():
+        async with InputClient(**kwargs) as client:
+            return await client.fetch_many(requests)
+
+    return asyncio.run(run())
+
+
+def get_data(year: int, day: int) -> str:
+    """Return puzzle input of the given day"""
+    if os.environ.get("AOC_INPUT_URL"):
+        return fetch_inputs([INPUT_REQUEST(year, day, default_session())])[0]
+
+    from aocd import get_data as aocd_get_data
+
+    return aocd_get_data(year=year, day=day)
+
+
+def _day_range(value: str) -> List[int]:
+    start, _, end = value.partition("-")
+    return list(range(int(start), int(end or start) + 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefetch puzzle inputs")
+    parser.add_argument("--year", type=int, default=2023)
+    parser.add_argument("--days", type=_day_range, default=_day_range("1-8"))
+    parser.add_argument(
+        "--sessions", help="file with one session token per line"
+    )
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE)
+    args = parser.parse_args()
+
+    if args.sessions:
+        with open(args.sessions) as f:
+            sessions = [line.strip() for line in f if line.strip()]
+    else:
+        sessions = [default_session()]
+    requests = [
+        INPUT_REQUEST(args.year, day, session)
+        for session in sessions
+        for day in args.days
+    ]
+
+    async def run():
+        async with InputClient(
+            args.url, args.concurrency, cache_dir=args.cache_dir
+        ) as client:
+            inputs = await client.fetch_many(requests)
+            for request, data in zip(requests, inputs):
+                print(
+                    f"{request.year} day {request.day:02d} "
+                    f"{account_id(request.session)}: {len(data)} bytes"
+                )
+            print(f"{client.connections_opened} connections opened")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
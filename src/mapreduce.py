@@ -0,0 +1,95 @@
+"""Chunked multi-core map-reduce over line-independent puzzle parts.
+
+The input file is split into byte ranges aligned to newlines, and each
+worker process memory-maps the file and sums a day's per-line kernel over
+its own range, so only (path, start, end) is sent to the workers and only
+partial sums come back. Days expose their kernels in `KERNELS`.
+
+    python src/mapreduce.py 1 part1 input.txt --workers 8
+"""
+import argparse
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import days
+
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def chunk_ranges(path: str, chunks: int) -> List[Tuple[int, int]]:
+    """Split file into at most `chunks` byte ranges ending on newlines"""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    ranges = []
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        start = 0
+        target = -(-size // max(chunks, 1))
+        while start < size:
+            end = min(start + target, size)
+            if end < size:
+                newline = mm.find(b"\n", end - 1)
+                end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def map_chunk(
+    path: str, start: int, end: int, kernel: Callable[[str], int]
+) -> int:
+    """Return sum of kernel over the lines in the byte range of the file"""
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        lines = mm[start:end].decode().splitlines()
+    return sum(kernel(line) for line in lines if line)
+
+
+def map_reduce(
+    path: str,
+    kernel: Callable[[str], int],
+    workers: Optional[int] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> int:
+    """Return sum of kernel over every line of the file using a process
+    pool. Kernels must be module level functions so they can be sent to
+    the workers by reference.
+    """
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    # At least one chunk per worker, and bounded chunk size for memory
+    chunks = max(workers, -(-size // chunk_bytes))
+    ranges = chunk_ranges(path, chunks)
+    if workers == 1 or len(ranges) <= 1:
+        return sum(map_chunk(path, *span, kernel) for span in ranges)
+
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(map_chunk, path, start, end, kernel)
+            for start, end in ranges
+        ]
+        return sum(future.result() for future in futures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("day", type=int)
+    parser.add_argument("part", choices=["part1", "part2"])
+    parser.add_argument("path")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    kernels = getattr(days.load(args.day), "KERNELS", {})
+    if args.part not in kernels:
+        parser.error(f"day {args.day} {args.part} has no per-line kernel")
+    print(map_reduce(args.path, kernels[args.part], args.workers))
+
+
+if __name__ == "__main__":
+    main()
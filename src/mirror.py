@@ -0,0 +1,121 @@
+"""Local stand-in for the puzzle input server, to use `InputClient` offline.
+
+Serves `GET /<year>/day/<day>/input` over HTTP/1.1 keep-alive from a
+directory laid out as `<root>/<year>/<day:02d>/<account>.txt`, where
+`<account>` is `inputs.account_id(session)` like in the `InputClient`
+cache, falling back to `<root>/<year>/<day:02d>.txt` for any session.
+Requests without a session cookie get 400 and missing inputs 404, like
+the real server.
+
+    python src/mirror.py inputs/ --port 8023
+    AOC_INPUT_URL=http://127.0.0.1:8023 python src/01.py
+"""
+import argparse
+import os
+import random
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from inputs import account_id
+
+PATH_RE = re.compile(r"^/(\d+)/day/(\d+)/input$")
+SESSION_RE = re.compile(r"(?:^|;\s*)session=([^;]+)")
+
+
+class MirrorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+        match = PATH_RE.match(self.path)
+        if not match:
+            return self._reply(404, b"Not Found\n")
+        session = SESSION_RE.search(self.headers.get("Cookie", ""))
+        if not session:
+            return self._reply(400, b"Puzzle inputs differ by user.\n")
+        if self.server.rng.random() < self.server.fail_rate:
+            return self._reply(503, b"Service Unavailable\n")
+
+        year, day = match.group(1), int(match.group(2))
+        directory = os.path.join(self.server.root, year)
+        # The hex account id never reaches outside root, unlike the cookie
+        account = account_id(session.group(1))
+        for path in (
+            os.path.join(directory, f"{day:02d}", f"{account}.txt"),
+            os.path.join(directory, f"{day:02d}.txt"),
+        ):
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    return self._reply(200, f.read())
+        return self._reply(404, b"Not Found\n")
+
+
+class MirrorServer(ThreadingHTTPServer):
+    """Threaded stand-in server, `fail_rate` of requests answer 503 to
+    exercise client retries"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        root: str,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fail_rate: float = 0.0,
+        seed: Optional[int] = None,
+        verbose: bool = False,
+    ):
+        super().__init__((host, port), MirrorHandler)
+        self.root = root
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> threading.Thread:
+        """Serve from a background thread, stop with `shutdown`"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8023)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MirrorServer(
+        args.root, args.host, args.port, args.fail_rate, verbose=True
+    )
+    print(f"Serving {args.root} on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
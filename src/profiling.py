@@ -0,0 +1,205 @@
+"""Opt-in instrumentation of the day solvers.
+
+Set `AOC_PROFILE` to a comma separated list of features to switch it on:
+
+    phases       wall time of every part and its parse/solve phases
+    counters     call counters on the hot paths
+    cprofile     cProfile stats of every part
+    tracemalloc  peak traced memory of every part
+    all          every feature above (so does "1")
+
+When a feature is off its hooks return the instrumented function unchanged
+or a shared null context, so the solvers run exactly as uninstrumented.
+At exit a summary is printed to stderr and written to `AOC_PROFILE_DIR`
+(default "profile"): `phases.folded` holds collapsed stacks in
+microseconds for flamegraph tools, `report.json` the counters and peaks,
+and `<day>.<part>.prof` the cProfile stats.
+"""
+import atexit
+import contextlib
+import functools
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, List, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+ALL_FEATURES = {"phases", "counters", "cprofile", "tracemalloc"}
+
+
+def _features() -> set:
+    value = os.environ.get("AOC_PROFILE", "").strip().lower()
+    if value in ("", "0"):
+        return set()
+    if value in ("1", "all"):
+        return set(ALL_FEATURES)
+    return {feature.strip() for feature in value.split(",")} & ALL_FEATURES
+
+
+FEATURES = _features()
+ENABLED = bool(FEATURES)
+PHASES = "phases" in FEATURES
+COUNTERS = "counters" in FEATURES
+
+counters: Counter = Counter()
+timings: Dict[str, int] = defaultdict(int)  # folded stack: nanoseconds
+peaks: Dict[str, int] = {}
+_stack: List[str] = []
+_profiling = False  # only the outermost part is cProfiled
+_null = contextlib.nullcontext()
+
+
+class _Phase:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        _stack.append(self.name)
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc):
+        timings[";".join(_stack)] += time.perf_counter_ns() - self.start
+        _stack.pop()
+
+
+def phase(name: str):
+    """Return context manager timing a named phase of the current part"""
+    return _Phase(name) if PHASES else _null
+
+
+def profiled(func: F) -> F:
+    """Decorate a part function with the enabled per-part instrumentation"""
+    if not ENABLED:
+        return func
+
+    import cProfile
+    import tracemalloc
+
+    day = os.path.splitext(os.path.basename(func.__code__.co_filename))[0]
+    name = f"day{day}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global _profiling
+        profile = None
+        if "cprofile" in FEATURES and not _profiling:
+            _profiling = True
+            profile = cProfile.Profile()
+            profile.enable()
+        tracing = "tracemalloc" in FEATURES and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        try:
+            with phase(name):
+                return func(*args, **kwargs)
+        finally:
+            if tracing:
+                peaks[name] = max(
+                    peaks.get(name, 0), tracemalloc.get_traced_memory()[1]
+                )
+                tracemalloc.stop()
+            if profile is not None:
+                profile.disable()
+                _profiling = False
+                profile.dump_stats(os.path.join(_output_dir(), f"{name}.prof"))
+
+    return wrapper
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add n to a counter, meant for call sites outside of hot loops"""
+    if COUNTERS:
+        counters[name] += n
+
+
+def counted(name: str) -> Callable[[F], F]:
+    """Decorate a function to count its calls"""
+
+    def decorator(func: F) -> F:
+        if not COUNTERS:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            counters[name] += 1
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count_calls(owner: type, attr: str, name: str) -> None:
+    """Count calls of a method by wrapping it on its class"""
+    if COUNTERS:
+        setattr(owner, attr, counted(name)(getattr(owner, attr)))
+
+
+def counting_key(key: Callable[[Any], Any], name: str) -> Callable:
+    """Wrap a sort key so that comparisons between keys are counted"""
+    if not COUNTERS:
+        return key
+
+    @functools.total_ordering
+    class CountingKey:
+        __slots__ = ("value",)
+
+        def __init__(self, item):
+            self.value = key(item)
+
+        def __eq__(self, other):
+            return self.value == other.value
+
+        def __lt__(self, other):
+            counters[name] += 1
+            return self.value < other.value
+
+    return CountingKey
+
+
+def _output_dir() -> str:
+    path = os.environ.get("AOC_PROFILE_DIR", "profile")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def write_report() -> None:
+    """Print summary to stderr and export collected profiles"""
+    import json
+
+    directory = _output_dir()
+    if timings:
+        # Folded stacks carry self time, flamegraph tools sum the children
+        self_ns = dict(timings)
+        for stack, ns in timings.items():
+            parent = stack.rpartition(";")[0]
+            if parent in self_ns:
+                self_ns[parent] -= ns
+        with open(os.path.join(directory, "phases.folded"), "w") as f:
+            for stack, ns in sorted(self_ns.items()):
+                f.write(f"{stack} {max(ns, 0) // 1000}\n")
+        print("phase timings (ms):", file=sys.stderr)
+        for stack, ns in sorted(timings.items()):
+            print(f"  {stack:<40} {ns / 1e6:>12.3f}", file=sys.stderr)
+    if counters:
+        print("counters:", file=sys.stderr)
+        for name, value in sorted(counters.items()):
+            print(f"  {name:<40} {value:>12}", file=sys.stderr)
+    if peaks:
+        print("peak traced memory (bytes):", file=sys.stderr)
+        for name, value in sorted(peaks.items()):
+            print(f"  {name:<40} {value:>12}", file=sys.stderr)
+    with open(os.path.join(directory, "report.json"), "w") as f:
+        json.dump(
+            {"phases_ns": timings, "counters": counters, "peaks": peaks},
+            f,
+            indent=2,
+        )
+
+
+if ENABLED:
+    atexit.register(write_report)
@@ -0,0 +1,219 @@
+"""Solve every day and part concurrently, longest task first.
+
+Each (day, part) runs in its own process, at most `--jobs` at a time, in
+descending order of its duration in a previous run (unknown tasks first).
+A task that runs past `--timeout` seconds is killed, its address space is
+capped to `--memory-mb`, and a crash only fails its own row. Durations of
+successful tasks are saved for the next run's ordering. The report shows
+every answer with its timings and the critical path, the longest task,
+that bounds the wall-clock time of the run.
+
+    python src/schedule.py --inputs inputs/ --jobs 4 --timeout 60
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+from typing import Any, Dict, List, Optional, Sequence
+
+import days
+
+PARTS = ("part1", "part2")
+DEFAULT_HISTORY = os.path.join("profile", "schedule.json")
+
+
+def _run_task(day: int, part: str, lines: List[str], memory: int, conn):
+    """Child process body, sends (status, answer, seconds) back"""
+    if memory:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    start = time.perf_counter()
+    try:
+        answer = getattr(days.load(day), part)(lines)
+        result = ("ok", answer)
+    except MemoryError:
+        result = ("memory", None)
+    except Exception as e:
+        result = ("error", f"{type(e).__name__}: {e}")
+    conn.send((*result, time.perf_counter() - start))
+    conn.close()
+
+
+def load_history(path: str) -> Dict[str, float]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_history(path: str, history: Dict[str, float]) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(history, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def schedule(
+    inputs: Dict[int, List[str]],
+    parts: Sequence[str] = PARTS,
+    jobs: Optional[int] = None,
+    timeout: Optional[float] = None,
+    memory: int = 0,
+    history: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, Any]]:
+    """Run every part of every day in `inputs` and return one result per
+    task, in scheduling order"""
+    jobs = jobs or os.cpu_count() or 1
+    history = history or {}
+    tasks = [(day, part) for day in sorted(inputs) for part in parts]
+    # Longest processing time first, unknown durations count as longest
+    tasks.sort(
+        key=lambda task: -history.get(f"{task[0]:02d}.{task[1]}", float("inf"))
+    )
+
+    results = []
+    running = {}  # sentinel: (result, process, parent end of pipe)
+    begin = time.perf_counter()
+    pending = list(reversed(tasks))
+    while pending or running:
+        while pending and len(running) < jobs:
+            day, part = pending.pop()
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=_run_task,
+                args=(day, part, inputs[day], memory, sender),
+                daemon=True,
+            )
+            process.start()
+            sender.close()
+            result = {
+                "day": day,
+                "part": part,
+                "status": "running",
+                "answer": None,
+                "start": time.perf_counter() - begin,
+            }
+            results.append(result)
+            running[process.sentinel] = (result, process, receiver)
+
+        now = time.perf_counter() - begin
+        deadline = None
+        if timeout is not None:
+            deadline = min(r["start"] for r, _, _ in running.values())
+            deadline = max(deadline + timeout - now, 0)
+        # Wait on the pipes too: a child blocks in send until its result is
+        # read, so reading only after it exits deadlocks on large results
+        ready = set(
+            wait(
+                [conn for _, _, conn in running.values()] + list(running),
+                deadline,
+            )
+        )
+
+        now = time.perf_counter() - begin
+        for sentinel in list(running):
+            result, process, receiver = running[sentinel]
+            if receiver in ready:
+                try:
+                    status, answer, seconds = receiver.recv()
+                except EOFError:
+                    # Pipe closed without a result, the child crashed
+                    process.join()
+                    result["status"] = f"crash ({process.exitcode})"
+                else:
+                    process.join()
+                    result.update(status=status, answer=answer)
+                    result["seconds"] = seconds
+            elif sentinel in ready:
+                process.join()
+                result["status"] = f"crash ({process.exitcode})"
+            elif timeout is not None and now - result["start"] >= timeout:
+                process.kill()
+                process.join()
+                result["status"] = "timeout"
+            else:
+                continue
+            result["end"] = now
+            receiver.close()
+            del running[sentinel]
+    return results
+
+
+def report(results: List[Dict[str, Any]]) -> None:
+    print(
+        f"{'day':>4} {'part':>6} {'status':>10} {'answer':>20} "
+        f"{'seconds':>9} {'start':>8} {'end':>8}"
+    )
+    for r in sorted(results, key=lambda r: (r["day"], r["part"])):
+        answer = "" if r["answer"] is None else str(r["answer"])[:20]
+        seconds = f"{r['seconds']:.3f}" if "seconds" in r else "-"
+        print(
+            f"{r['day']:>4} {r['part']:>6} {r['status']:>10} {answer:>20} "
+            f"{seconds:>9} {r['start']:>8.3f} {r['end']:>8.3f}"
+        )
+
+    wall = max(r["end"] for r in results)
+    serial = sum(r["end"] - r["start"] for r in results)
+    longest = max(results, key=lambda r: r["end"] - r["start"])
+    print(
+        f"wall {wall:.3f}s, serial {serial:.3f}s, "
+        f"speedup {serial / wall if wall else 0:.2f}x, critical path "
+        f"day {longest['day']:02d} {longest['part']} "
+        f"{longest['end'] - longest['start']:.3f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--inputs", help="directory of 01.txt ... 08.txt, else fetched"
+    )
+    parser.add_argument("--days", type=int, nargs="+", default=list(days.DAYS))
+    parser.add_argument("--parts", nargs="+", choices=PARTS, default=PARTS)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--memory-mb", type=int, default=0)
+    parser.add_argument("--history", default=DEFAULT_HISTORY)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    if args.inputs:
+        inputs = {}
+        for day in args.days:
+            with open(os.path.join(args.inputs, f"{day:02d}.txt")) as f:
+                inputs[day] = f.read().splitlines()
+    else:
+        from inputs import get_data
+
+        inputs = {
+            day: get_data(year=2023, day=day).splitlines() for day in args.days
+        }
+
+    history = load_history(args.history)
+    results = schedule(
+        inputs,
+        args.parts,
+        args.jobs,
+        args.timeout,
+        args.memory_mb * 1024 * 1024,
+        history,
+    )
+    report(results)
+    for r in results:
+        if r["status"] == "ok":
+            history[f"{r['day']:02d}.{r['part']}"] = r["seconds"]
+    save_history(args.history, history)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()